@@ -6,6 +6,7 @@ from app.models.base import Base
 from app.models.user import User
 from app.models.favorite import Favorite
 from app.models.history import AiHistory
+from app.models.spotify_metadata import SpotifyMetadata
 from dotenv import load_dotenv
 
 # Load environment variables
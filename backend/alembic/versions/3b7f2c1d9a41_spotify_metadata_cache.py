@@ -0,0 +1,36 @@
+"""spotify_metadata_cache
+
+Revision ID: 3b7f2c1d9a41
+Revises: e9db39654fa9
+Create Date: 2026-10-18 09:12:41.204113
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# Alembic revision identifiers
+revision: str = '3b7f2c1d9a41'
+down_revision: Union[str, None] = 'e9db39654fa9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade():
+    """Upgrade schema."""
+    op.create_table(
+        'spotify_metadata',
+        sa.Column('entity_type', sa.String(length=10), nullable=False),
+        sa.Column('spotify_id', sa.String(length=50), nullable=False),
+        sa.Column('data', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('fetched_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('entity_type', 'spotify_id'),
+    )
+    op.create_index(
+        'ix_spotify_metadata_fetched_at', 'spotify_metadata', ['fetched_at']
+    )
+
+def downgrade():
+    """Downgrade schema."""
+    op.drop_index('ix_spotify_metadata_fetched_at', table_name='spotify_metadata')
+    op.drop_table('spotify_metadata')
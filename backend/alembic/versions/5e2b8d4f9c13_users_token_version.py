@@ -0,0 +1,27 @@
+"""users_token_version
+
+Revision ID: 5e2b8d4f9c13
+Revises: d51a9e3c7b28
+Create Date: 2026-10-18 15:48:52.107226
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# Alembic revision identifiers
+revision: str = '5e2b8d4f9c13'
+down_revision: Union[str, None] = 'd51a9e3c7b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade():
+    """Upgrade schema."""
+    op.add_column(
+        'users',
+        sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+def downgrade():
+    """Downgrade schema."""
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,25 @@
+"""ai_history_user_created_index
+
+Revision ID: 8c4e1a7f2b60
+Revises: 3b7f2c1d9a41
+Create Date: 2026-10-18 14:03:27.518402
+"""
+from typing import Sequence, Union
+from alembic import op
+
+
+# Alembic revision identifiers
+revision: str = '8c4e1a7f2b60'
+down_revision: Union[str, None] = '3b7f2c1d9a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade():
+    """Upgrade schema."""
+    op.create_index(
+        'ix_ai_history_user_id_created_at', 'ai_history', ['user_id', 'created_at']
+    )
+
+def downgrade():
+    """Downgrade schema."""
+    op.drop_index('ix_ai_history_user_id_created_at', table_name='ai_history')
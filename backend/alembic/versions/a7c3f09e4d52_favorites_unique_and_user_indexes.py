@@ -0,0 +1,40 @@
+"""favorites_unique_and_user_indexes
+
+Revision ID: a7c3f09e4d52
+Revises: 5e2b8d4f9c13
+Create Date: 2026-10-18 16:10:38.842915
+"""
+from typing import Sequence, Union
+from alembic import op
+
+
+# Alembic revision identifiers
+revision: str = 'a7c3f09e4d52'
+down_revision: Union[str, None] = '5e2b8d4f9c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade():
+    """Upgrade schema."""
+    # Keep the oldest row of every duplicate before enforcing uniqueness
+    op.execute(
+        'DELETE FROM favorites AS duplicate USING favorites AS kept '
+        'WHERE duplicate.user_id = kept.user_id '
+        'AND duplicate.type = kept.type '
+        'AND duplicate.spotify_id = kept.spotify_id '
+        'AND duplicate.id > kept.id'
+    )
+    op.create_index(
+        'uq_favorites_user_id_type_spotify_id',
+        'favorites',
+        ['user_id', 'type', 'spotify_id'],
+        unique=True,
+    )
+    op.create_index(
+        'ix_favorites_user_id_created_at', 'favorites', ['user_id', 'created_at']
+    )
+
+def downgrade():
+    """Downgrade schema."""
+    op.drop_index('ix_favorites_user_id_created_at', table_name='favorites')
+    op.drop_index('uq_favorites_user_id_type_spotify_id', table_name='favorites')
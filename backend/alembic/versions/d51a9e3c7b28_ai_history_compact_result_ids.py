@@ -0,0 +1,72 @@
+"""ai_history_compact_result_ids
+
+Revision ID: d51a9e3c7b28
+Revises: 8c4e1a7f2b60
+Create Date: 2026-10-18 15:21:09.633170
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# Alembic revision identifiers
+revision: str = 'd51a9e3c7b28'
+down_revision: Union[str, None] = '8c4e1a7f2b60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+RESULT_KEYS = ('tracks', 'artists', 'albums')
+
+
+def _ids_from_response(key):
+    """SQL collecting the ids of one result type from the old response."""
+    items = f"response::jsonb -> 'results' -> '{key}'"
+    return f"""
+        '{key}', COALESCE((
+            SELECT jsonb_agg(item ->> 'id')
+            FROM jsonb_array_elements(
+                CASE WHEN jsonb_typeof({items}) = 'array'
+                THEN {items} ELSE '[]'::jsonb END
+            ) AS item
+            WHERE jsonb_typeof(item) = 'object' AND item ->> 'id' IS NOT NULL
+        ), '[]'::jsonb)"""
+
+
+def _response_from_ids(key):
+    """SQL rebuilding one result type of the old response from stored ids."""
+    return f"""
+        '{key}', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('id', id))
+            FROM jsonb_array_elements_text(result_ids -> '{key}') AS id
+        ), '[]'::jsonb)"""
+
+
+def upgrade():
+    """Upgrade schema."""
+    op.add_column(
+        'ai_history',
+        sa.Column('result_ids', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+    op.execute(
+        'UPDATE ai_history SET result_ids = jsonb_build_object('
+        + ','.join(_ids_from_response(key) for key in RESULT_KEYS)
+        + ')'
+    )
+    op.alter_column('ai_history', 'result_ids', nullable=False)
+    op.drop_column('ai_history', 'response')
+
+def downgrade():
+    """Downgrade schema.
+
+    Only the ids can be restored; names, images and urls are gone.
+    """
+    op.add_column('ai_history', sa.Column('response', sa.Text(), nullable=True))
+    op.execute(
+        "UPDATE ai_history SET response = jsonb_build_object('results', "
+        'jsonb_build_object('
+        + ','.join(_response_from_ids(key) for key in RESULT_KEYS)
+        + '))::text'
+    )
+    op.alter_column('ai_history', 'response', nullable=False)
+    op.drop_column('ai_history', 'result_ids')
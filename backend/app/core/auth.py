@@ -8,6 +8,7 @@ from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.models.user import User
 from app.core.db import get_db
+from app.core.cache import TTLCache
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
@@ -17,6 +18,14 @@ load_dotenv()
 SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Embed the user id and token version in tokens (for stateless consumers)
+JWT_USER_CLAIMS = os.getenv("JWT_USER_CLAIMS", "false").lower() == "true"
+
+# Authenticated user cache, username -> column values
+USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+USER_CACHE_MAXSIZE = int(os.getenv("AUTH_USER_CACHE_MAXSIZE", "1024"))
+USER_COLUMNS = ("id", "username", "email", "hashed_password", "token_version")
+user_cache = TTLCache(maxsize=USER_CACHE_MAXSIZE, ttl=USER_CACHE_TTL)
 
 # Security components
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
@@ -32,6 +41,22 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     return jwt.encode({"alg": ALGORITHM}, to_encode, SECRET_KEY)
 
 
+def token_claims(user: User) -> dict:
+    """Build the claims of a user's access token.
+
+    ``uid`` and ``ver`` are only added when JWT_USER_CLAIMS is enabled.
+    """
+    claims = {"sub": user.username}
+    if JWT_USER_CLAIMS:
+        claims.update(uid=user.id, ver=user.token_version)
+    return claims
+
+
+def invalidate_cached_user(username: str):
+    """Drop a user from the authentication cache after it changes."""
+    user_cache.delete(username)
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
@@ -49,11 +74,22 @@ async def get_current_user(
                 status_code=401, detail="Could not validate credentials"
             )
 
-        result = await db.execute(select(User).filter(User.username == username))
-        user = result.scalar_one_or_none()
-        if user is None:
-            raise HTTPException(status_code=401, detail="User not found")
+        cached = user_cache.get(username)
+        if cached is not None:
+            # Detached copy, so callers never share or mutate the cached state
+            user = User(**cached)
+        else:
+            result = await db.execute(select(User).filter(User.username == username))
+            user = result.scalar_one_or_none()
+            if user is None:
+                raise HTTPException(status_code=401, detail="User not found")
+
+            user_cache.set(
+                username, {column: getattr(user, column) for column in USER_COLUMNS}
+            )
 
+        if "ver" in payload and payload["ver"] != user.token_version:
+            raise HTTPException(status_code=401, detail="Token has been revoked")
         return user
     except JoseError:
         raise HTTPException(status_code=401, detail="Could not validate credentials")
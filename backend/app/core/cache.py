@@ -0,0 +1,120 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Iterator
+
+# In-process caching primitives
+
+MISSING = object()
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries expire after a TTL.
+
+    ``get`` returns ``default`` for absent or expired keys, so callers that
+    need to cache ``None`` should pass ``MISSING`` as the default.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value and mark it as recently used."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None):
+        """Store a value, evicting the least recently used entry when full."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable):
+        """Remove a key if present."""
+        self._data.pop(key, None)
+
+    def clear(self):
+        """Remove all entries."""
+        self._data.clear()
+
+    def items(self) -> Iterator[tuple[Hashable, Any]]:
+        """Iterate over live entries without touching their recency."""
+        now = time.monotonic()
+        for key, (expires_at, value) in list(self._data.items()):
+            if expires_at > now:
+                yield key, value
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """Return cache counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one in-flight call.
+
+    Callers arriving while a call for their key is running wait for its
+    result for at most ``wait_timeout`` seconds. If the shared call fails or
+    the wait runs out, they fall back to an independent call of their own.
+    """
+
+    def __init__(self, wait_timeout: float | None = None):
+        self.wait_timeout = wait_timeout
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+        self.fallbacks = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            # Shield so a cancelled caller does not cancel the shared call
+            return await asyncio.shield(task)
+
+        self.shared += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), self.wait_timeout)
+        except Exception:
+            self.fallbacks += 1
+            return await fn()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._inflight),
+            "calls": self.calls,
+            "shared": self.shared,
+            "fallbacks": self.fallbacks,
+        }
@@ -0,0 +1,37 @@
+import os
+import httpx
+
+# Pooled client for calls to the music-service
+MUSIC_SERVICE_URL = os.getenv("MUSIC_SERVICE_URL", "http://music-service:8001")
+MUSIC_SERVICE_TIMEOUT = float(os.getenv("MUSIC_SERVICE_TIMEOUT", "10"))
+MUSIC_SERVICE_MAX_CONNECTIONS = int(os.getenv("MUSIC_SERVICE_MAX_CONNECTIONS", "50"))
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_music_service_client() -> httpx.AsyncClient:
+    """Get the shared music-service client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=MUSIC_SERVICE_URL,
+            timeout=MUSIC_SERVICE_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=MUSIC_SERVICE_MAX_CONNECTIONS,
+                max_keepalive_connections=MUSIC_SERVICE_MAX_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+async def init_http_client():
+    """Open the shared music-service client."""
+    get_music_service_client()
+
+
+async def close_http_client():
+    """Close the shared music-service client."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -1,136 +1,340 @@
-from app.services.ai import ask_gemini
-import re
+from app.services.ai import ask_gemini, ask_gemini_stream
+from app.services.structured_output import (
+    IncrementalListParser,
+    parse_name_list,
+    parse_structured,
+)
+from app.services.prompt_cache import normalize_prompt, prompt_cache, prompt_flight
+from app.services.home_precompute import home_precomputer
+from app.services.history_writer import history_writer
 import json
-from app.schemas.ai import AISpecificRequest
+from app.schemas.ai import AIRecommendations, AISpecificRequest
 from app.models.history import AiHistory
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-import httpx
+from sqlalchemy import select, tuple_
+from app.core.http import get_music_service_client
+from app.core.pagination import decode_cursor, encode_cursor
+import asyncio
+import os
+
 # AI history operations
 
+# Per-call timeout for Spotify enrichment through the music-service
+ENRICHMENT_TIMEOUT = float(os.getenv("AI_ENRICHMENT_TIMEOUT", "8"))
+
+HISTORY_PAGE_SIZE = 10
+# Ids per rehydration request; 50 Spotify ids keep the URL around 1.2KB
+SUMMARY_IDS_PER_REQUEST = 50
+HISTORY_FIELDS = {"prompt", "response", "timestamp"}
+
+ENTITY_TYPES = {"tracks": "track", "artists": "artist", "albums": "album"}
+COMPANION_SYSTEM_PROMPT = (
+    "Return *only* a valid JSON object with exactly 3 keys: 'tracks', 'artists', and 'albums'. "
+    "Each key must map to an array of names (strings). "
+    "No explanations or extra text — only valid JSON."
+)
+
+
+async def _cached_result(kind: str, prompt: str, compute):
+    """Serve an AI result from the prompt cache, computing it on a miss.
+
+    Concurrent misses for the same prompt share a single computation.
+    """
+    cached = prompt_cache.get(kind, prompt)
+    if cached is not None:
+        return cached
+
+    async def compute_and_store():
+        result = await compute()
+        if _has_results(result["results"]):
+            prompt_cache.set(kind, prompt, result)
+        return result
+
+    return await prompt_flight.do((kind, normalize_prompt(prompt)), compute_and_store)
+
+
+def _has_results(results) -> bool:
+    if isinstance(results, dict):
+        return any(results.values())
+    return bool(results)
+
 
 async def get_recommendations_home(request: str):
-    """Get AI home recommendations."""
-    ai_response = ask_gemini(request)
-    cleaned_response = re.sub(
-        r"```(?:json)?\n(.+?)\n```", r"\1", ai_response, flags=re.DOTALL
-    )
-    data = json.loads(cleaned_response)
-    tracks = data.get("tracks", [])
-    artists = data.get("artists", [])
-    albums = data.get("albums", [])
-
-    print("tracks:", tracks, type(tracks))
-    print("artists:", artists, type(artists))
-    print("albums:", albums, type(albums))
-
-    enriched_tracks = await search_spotify_entities(tracks, "track") if tracks else []
-    enriched_artists = (
-        await search_spotify_entities(artists, "artist") if artists else []
+    """Get AI home recommendations.
+
+    Precomputed sets are served first; other prompts are computed live.
+    """
+    precomputed = home_precomputer.get(request)
+    if precomputed is not None:
+        return precomputed
+    return await _cached_result(
+        "home", request, lambda: compute_recommendations_home(request)
     )
-    enriched_albums = await search_spotify_entities(albums, "album") if albums else []
 
+
+async def compute_recommendations_home(request: str):
+    ai_response = await ask_gemini(request)
+    data = parse_structured(ai_response, AIRecommendations)
     return {
-        "results": {
-            "tracks": enriched_tracks,
-            "artists": enriched_artists,
-            "albums": enriched_albums,
-        }
+        "results": await enrich_recommendations(data.tracks, data.artists, data.albums)
     }
 
 
 async def get_recommendations_button(request: AISpecificRequest):
     """Get AI button recommendations."""
-    ai_response = ask_gemini(request.prompt)
-    names = [
-        line.strip("- ").strip()
-        for line in ai_response.strip().splitlines()
-        if line.strip()
-    ]
+    return await _cached_result(
+        f"button:{request.type}",
+        request.prompt,
+        lambda: _compute_recommendations_button(request),
+    )
+
+
+async def _compute_recommendations_button(request: AISpecificRequest):
+    ai_response = await ask_gemini(request.prompt)
+    names = parse_name_list(ai_response)
     enriched = await search_spotify_entities(names, request.type)
     return {"results": enriched}
 
 
-async def get_companion(db: AsyncSession, prompt: str, user_id: int = None):
-    """Get AI companion response."""
-    system_prompt = (
-        "Return *only* a valid JSON object with exactly 3 keys: 'tracks', 'artists', and 'albums'. "
-        "Each key must map to an array of names (strings). "
-        "No explanations or extra text — only valid JSON."
+async def get_companion(prompt: str, user_id: int = None):
+    """Get AI companion response.
+
+    The exchange is queued for the history writer, so the response does
+    not wait on the database.
+    """
+    result = await _cached_result(
+        "companion", prompt, lambda: _compute_companion(prompt)
     )
-    full_prompt = f"User asked: '{prompt}'.\n{system_prompt}"
-    ai_response_text = ask_gemini(full_prompt)
-    match = re.search(r"```(?:json)?\s*(.+?)\s*```", ai_response_text, flags=re.DOTALL)
-    if match:
-        extracted_content = match.group(1)
-        cleaned_response = " ".join(extracted_content.split()).strip()
-    else:
-        cleaned_response = " ".join(ai_response_text.split()).strip()
-    try:
-        data = json.loads(cleaned_response)
-    except json.JSONDecodeError:
-        raise json.JSONDecodeError("Failed to parse AI JSON", cleaned_response, 0)
+    if user_id is not None:
+        history_writer.enqueue(user_id, prompt, result_ids(result))
 
-    tracks = data.get("tracks", [])
-    artists = data.get("artists", [])
-    albums = data.get("albums", [])
+    return result
 
-    enriched_tracks = await search_spotify_entities(tracks, "track") if tracks else []
-    enriched_artists = (
-        await search_spotify_entities(artists, "artist") if artists else []
-    )
-    enriched_albums = await search_spotify_entities(albums, "album") if albums else []
-    result = {
-        "results": {
-            "tracks": enriched_tracks,
-            "artists": enriched_artists,
-            "albums": enriched_albums,
-        }
+
+async def _compute_companion(prompt: str):
+    full_prompt = f"User asked: '{prompt}'.\n{COMPANION_SYSTEM_PROMPT}"
+    ai_response_text = await ask_gemini(full_prompt)
+    data = parse_structured(ai_response_text, AIRecommendations)
+    return {
+        "results": await enrich_recommendations(data.tracks, data.artists, data.albums)
     }
-    if user_id is not None:
+
+
+async def stream_companion(prompt: str, user_id: int = None):
+    """Stream AI companion results as server-sent events.
+
+    Names are parsed out of the Gemini stream as soon as each one is
+    complete and enriched individually, so the first ``result`` event is
+    sent long before the full response exists. A final ``done`` event
+    carries the complete results in the order Gemini produced them.
+    """
+    full_prompt = f"User asked: '{prompt}'.\n{COMPANION_SYSTEM_PROMPT}"
+    events: asyncio.Queue = asyncio.Queue()
+    finished = object()
+
+    async def enrich_one(key: str, index: int, name: str):
         try:
-            entry = AiHistory(
-                user_id=user_id,
-                prompt=prompt,
-                response=json.dumps(result),
+            found = await search_spotify_entities([name], ENTITY_TYPES[key])
+        except Exception as e:
+            print(f"[Companion] Failed to enrich {name!r}: {e!r}")
+            return
+        for item in found:
+            await events.put((key, index, item))
+
+    async def produce():
+        parser = IncrementalListParser(ENTITY_TYPES)
+        counts = dict.fromkeys(ENTITY_TYPES, 0)
+        enrichments = []
+        try:
+            async for chunk in ask_gemini_stream(full_prompt):
+                for key, name in parser.feed(chunk):
+                    enrichments.append(
+                        asyncio.create_task(enrich_one(key, counts[key], name))
+                    )
+                    counts[key] += 1
+            await asyncio.gather(*enrichments)
+        finally:
+            for task in enrichments:
+                task.cancel()
+            await events.put(finished)
+
+    producer = asyncio.create_task(produce())
+    collected = {key: [] for key in ENTITY_TYPES}
+    try:
+        while (event := await events.get()) is not finished:
+            key, index, item = event
+            collected[key].append((index, item))
+            yield _sse(
+                "result", {"type": ENTITY_TYPES[key], "index": index, "item": item}
             )
-            db.add(entry)
-            await db.commit()
+
+        try:
+            await producer
         except Exception as e:
-            db.rollback()
-            print(f"[Companion] Failed to save AI history: {e}")
+            yield _sse("error", {"detail": str(e) or type(e).__name__})
+            return
 
-    return result
+        result = {
+            "results": {
+                key: [item for _, item in sorted(items, key=lambda pair: pair[0])]
+                for key, items in collected.items()
+            }
+        }
+        if user_id is not None:
+            history_writer.enqueue(user_id, prompt, result_ids(result))
+        yield _sse("done", result)
+    finally:
+        producer.cancel()
 
 
-async def get_companion_history(db: AsyncSession, user_id: int):
-    try:
-        stmt = (
-            select(AiHistory)
-            .where(AiHistory.user_id == user_id)
-            .order_by(AiHistory.created_at.asc())
-            .limit(10)
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def get_companion_history(
+    db: AsyncSession,
+    user_id: int,
+    limit: int = HISTORY_PAGE_SIZE,
+    cursor: str | None = None,
+    fields: set[str] | None = None,
+):
+    """Get a page of companion history, newest first.
+
+    Pages are keyed on (created_at, id); the returned cursor fetches the
+    next, older page and is None on the last one. ``fields`` limits the
+    returned keys. Stored ids are only loaded, and rehydrated into
+    Spotify summaries, when the response is requested.
+    """
+    fields = HISTORY_FIELDS if fields is None else fields & HISTORY_FIELDS
+    columns = [AiHistory.id, AiHistory.created_at, AiHistory.prompt]
+    if "response" in fields:
+        columns.append(AiHistory.result_ids)
+
+    stmt = (
+        select(*columns)
+        .where(AiHistory.user_id == user_id)
+        .order_by(AiHistory.created_at.desc(), AiHistory.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        created_at, id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(AiHistory.created_at, AiHistory.id) < tuple_(created_at, id)
         )
-        result = await db.execute(stmt)
-        entries = result.scalars().all()
-        return [
-            {
-                "prompt": entry.prompt,
-                "response": json.loads(entry.response),
-                "timestamp": entry.created_at,
+
+    rows = (await db.execute(stmt)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    summaries = {}
+    if "response" in fields:
+        summaries = await _summarize_ids([row.result_ids for row in rows])
+
+    entries = []
+    for row in rows:
+        entry = {}
+        if "prompt" in fields:
+            entry["prompt"] = row.prompt
+        if "response" in fields:
+            entry["response"] = {
+                "results": {
+                    key: [
+                        summaries.get((key, id)) or {"id": id}
+                        for id in row.result_ids.get(key, [])
+                    ]
+                    for key in ENTITY_TYPES
+                }
             }
-            for entry in entries
-        ]
-    except Exception as e:
-        print(f"[Companion History] Error fetching history: {e}")
-        return []
+        if "timestamp" in fields:
+            entry["timestamp"] = row.created_at
+        entries.append(entry)
+    return entries, next_cursor
 
 
-async def search_spotify_entities(names, entity_type):
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            "http://music-service:8001/spotify/entities",
-            params=[("names", n) for n in names] + [("type_", entity_type)],
+def result_ids(result: dict) -> dict:
+    """Reduce an enriched result to the Spotify ids stored in history."""
+    return {
+        key: [item["id"] for item in result["results"].get(key, []) if item.get("id")]
+        for key in ENTITY_TYPES
+    }
+
+
+async def _summarize_ids(stored: list[dict]) -> dict:
+    """Look up Spotify summaries for every id on a history page at once.
+
+    Ids go out in chunks of ``SUMMARY_IDS_PER_REQUEST`` to keep each query
+    string well under the server's request line limit. Returns a
+    ``{(key, id): summary}`` map; ids whose lookup fails are left out so
+    callers fall back to a bare ``{"id": ...}``.
+    """
+    ids_by_key = {
+        key: list(dict.fromkeys(id for ids in stored for id in ids.get(key, [])))
+        for key in ENTITY_TYPES
+    }
+    requests = [
+        (key, ids[i : i + SUMMARY_IDS_PER_REQUEST])
+        for key, ids in ids_by_key.items()
+        for i in range(0, len(ids), SUMMARY_IDS_PER_REQUEST)
+    ]
+
+    async def summarize(key: str, ids: list[str]):
+        response = await get_music_service_client().get(
+            "/spotify/entities/by-ids",
+            params={"ids": ",".join(ids), "type_": ENTITY_TYPES[key]},
+            timeout=ENRICHMENT_TIMEOUT,
         )
         response.raise_for_status()
         return response.json()
+
+    results = await asyncio.gather(
+        *(summarize(key, ids) for key, ids in requests),
+        return_exceptions=True,
+    )
+    summaries = {}
+    for (key, _), result in zip(requests, results):
+        if isinstance(result, Exception):
+            print(f"[Companion History] Failed to rehydrate {key}: {result!r}")
+            continue
+        for item in result:
+            summaries[(key, item["id"])] = item
+    return summaries
+
+
+async def search_spotify_entities(names, entity_type):
+    response = await get_music_service_client().get(
+        "/spotify/entities",
+        params=[("names", n) for n in names] + [("type_", entity_type)],
+        timeout=ENRICHMENT_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+async def enrich_recommendations(tracks, artists, albums):
+    """Enrich track, artist and album names with Spotify data concurrently.
+
+    A type whose enrichment fails or times out comes back empty instead of
+    failing the whole response.
+    """
+    requested = {
+        "tracks": (tracks, "track"),
+        "artists": (artists, "artist"),
+        "albums": (albums, "album"),
+    }
+
+    async def enrich(names, entity_type):
+        return await search_spotify_entities(names, entity_type) if names else []
+
+    results = await asyncio.gather(
+        *(enrich(names, entity_type) for names, entity_type in requested.values()),
+        return_exceptions=True,
+    )
+    enriched = {}
+    for key, result in zip(requested, results):
+        if isinstance(result, Exception):
+            print(f"[AI] Failed to enrich {key}: {result!r}")
+            result = []
+        enriched[key] = result
+    return enriched
@@ -4,6 +4,7 @@ from sqlalchemy import asc, desc
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate, UserReplace, PasswordChange
 from app.core.security import hash_password, verify_password
+from app.core.auth import invalidate_cached_user
 
 # User CRUD operations
 
@@ -79,6 +80,7 @@ async def delete_user(db: AsyncSession, user_id: int) -> bool:
     if user:
         await db.delete(user)
         await db.commit()
+        invalidate_cached_user(user.username)
         return True
     return False
 
@@ -90,12 +92,14 @@ async def update_user(db: AsyncSession, user_id: int, user_update: UserUpdate):
 
     if not user:
         return None
+    old_username = user.username
     if user_update.username is not None:
         user.username = user_update.username
     if user_update.email is not None:
         user.email = user_update.email
 
     await db.commit()
+    invalidate_cached_user(old_username)
     await db.refresh(user)
     return user
 
@@ -107,11 +111,13 @@ async def replace_user(db: AsyncSession, user_id: int, user_replace: UserReplace
 
     if not user:
         return None
+    old_username = user.username
 
     user.username = user_replace.username
     user.email = user_replace.email
 
     await db.commit()
+    invalidate_cached_user(old_username)
     await db.refresh(user)
     return user
 
@@ -125,6 +131,9 @@ async def change_password(db: AsyncSession, payload: PasswordChange, username: s
     if not verify_password(payload.current_password, user.hashed_password):
         return False
     user.hashed_password = hash_password(payload.new_password)
+    # Revoke tokens issued before the change
+    user.token_version = (user.token_version or 0) + 1
     await db.commit()
+    invalidate_cached_user(username)
     await db.refresh(user)
     return True
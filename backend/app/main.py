@@ -1,6 +1,10 @@
 from fastapi import FastAPI
 from app.models.base import Base
 from app.core.db import init_db
+from app.core.http import init_http_client, close_http_client
+from app.crud.ai import compute_recommendations_home
+from app.services.home_precompute import home_precomputer
+from app.services.history_writer import history_writer
 from app.routers import (
     user,
     ai,
@@ -20,8 +24,26 @@ async def lifespan(app: FastAPI):
     async with db_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
+    # Startup: open pooled music-service client
+    await init_http_client()
+
+    # Startup: batch AI history writes in the background
+    history_writer.start()
+
+    # Startup: precompute home recommendations in the background
+    home_precomputer.start(compute_recommendations_home)
+
     yield
 
+    # Shutdown: stop home recommendation refreshes
+    await home_precomputer.stop()
+
+    # Shutdown: write queued AI history rows
+    await history_writer.stop()
+
+    # Shutdown: close pooled music-service client
+    await close_http_client()
+
 
 app = FastAPI(lifespan=lifespan)
 
@@ -40,4 +62,5 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
@@ -1,2 +1,3 @@
 from .user import User
 from .favorite import Favorite, FavoriteType
+from .spotify_metadata import SpotifyMetadata
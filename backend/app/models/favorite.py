@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Index
 from datetime import datetime, timezone
 from enum import Enum as PyEnum
 from .base import Base
@@ -18,6 +18,16 @@ def default_utcnow():
 
 class Favorite(Base):
     __tablename__ = "favorites"
+    __table_args__ = (
+        Index(
+            "uq_favorites_user_id_type_spotify_id",
+            "user_id",
+            "type",
+            "spotify_id",
+            unique=True,
+        ),
+        Index("ix_favorites_user_id_created_at", "user_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
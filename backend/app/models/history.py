@@ -1,13 +1,18 @@
-from sqlalchemy import Column, Integer, Text, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, Text, ForeignKey, DateTime, Index, func
+from sqlalchemy.dialects.postgresql import JSONB
 from .base import Base
 
 
 # AI chat history model
 class AiHistory(Base):
     __tablename__ = "ai_history"
+    __table_args__ = (
+        Index("ix_ai_history_user_id_created_at", "user_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     prompt = Column(Text, nullable=False)
-    response = Column(Text, nullable=False)
+    # Spotify ids per result type, e.g. {"tracks": ["id", ...], ...}
+    result_ids = Column(JSONB, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
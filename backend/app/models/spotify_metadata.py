@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime, timezone
+from .base import Base
+
+
+# Shared Spotify metadata cache
+class SpotifyMetadata(Base):
+    __tablename__ = "spotify_metadata"
+
+    entity_type = Column(String(10), primary_key=True)
+    spotify_id = Column(String(50), primary_key=True)
+    data = Column(JSONB, nullable=False)
+    fetched_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+        index=True,
+    )
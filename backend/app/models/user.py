@@ -10,3 +10,5 @@ class User(Base):
     username = Column(String, unique=True, index=True, nullable=False)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
+    # Bumped to revoke tokens carrying an older "ver" claim
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
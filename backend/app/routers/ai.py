@@ -1,21 +1,30 @@
-from fastapi import APIRouter, HTTPException
-import json
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+import asyncio
+from typing import Optional
 from app.schemas.ai import AIRequest, AISpecificRequest
 from app.crud.ai import (
     get_recommendations_home,
     get_companion,
     get_recommendations_button,
     get_companion_history,
+    stream_companion,
+    HISTORY_PAGE_SIZE,
 )
 from fastapi import Depends
 from app.core.auth import get_current_user
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.db import get_db
 from app.models.user import User
+from app.services.ai import gemini
+from app.services.prompt_cache import prompt_cache, prompt_flight
+from app.services.home_precompute import home_precomputer
+from app.services.history_writer import history_writer
+from app.services.structured_output import StructuredOutputError
 
 # AI endpoints
 router = APIRouter(prefix="/ai", tags=["ai"])
-ai_response_is_not_valid = "AI response is not valid JSON"
+ai_request_timed_out = "AI request timed out"
 
 
 @router.post("/recommend-home")
@@ -24,8 +33,10 @@ async def ai_recommend_home(request: AIRequest):
     try:
         result = await get_recommendations_home(request.prompt)
         return result
-    except json.JSONDecodeError:
+    except StructuredOutputError:
         raise HTTPException(status_code=400, detail="Invalid AI response")
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=ai_request_timed_out)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -36,6 +47,8 @@ async def ai_recommend(request: AISpecificRequest):
     try:
         result = await get_recommendations_button(request)
         return result
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=ai_request_timed_out)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -44,26 +57,71 @@ async def ai_recommend(request: AISpecificRequest):
 async def ai_companion(
     request: AIRequest,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
 ):
     """Get AI companion response."""
     try:
-        result = await get_companion(db, request.prompt, user_id=current_user.id)
+        result = await get_companion(request.prompt, user_id=current_user.id)
         return result
-    except json.JSONDecodeError:
+    except StructuredOutputError:
         raise HTTPException(status_code=400, detail="Invalid AI response")
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=ai_request_timed_out)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/companion/stream")
+async def ai_companion_stream(
+    request: AIRequest,
+    current_user: User = Depends(get_current_user),
+):
+    """Stream AI companion results as server-sent events."""
+    return StreamingResponse(
+        stream_companion(request.prompt, user_id=current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/companion")
 async def ai_companion_get_history(
-    current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    response: Response,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(
+        None, description="Comma-separated subset of prompt,response,timestamp"
+    ),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
+    """Get companion history, newest first.
+
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    """
     try:
-        result = await get_companion_history(db, user_id=current_user.id)
+        result, next_cursor = await get_companion_history(
+            db,
+            user_id=current_user.id,
+            limit=limit,
+            cursor=cursor,
+            fields=set(fields.split(",")) if fields else None,
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return result
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail=ai_response_is_not_valid)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/stats")
+async def ai_stats(current_user: User = Depends(get_current_user)):
+    """Get AI client queue depth and counters."""
+    return {
+        "gemini": gemini.stats(),
+        "prompt_cache": prompt_cache.stats(),
+        "coalescing": prompt_flight.stats(),
+        "home_precompute": home_precomputer.stats(),
+        "history_writer": history_writer.stats(),
+    }
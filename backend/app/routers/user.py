@@ -21,7 +21,7 @@ from app.crud.user import (
     change_password,
 )
 from app.core.db import get_db
-from app.core.auth import create_access_token, get_current_user
+from app.core.auth import create_access_token, get_current_user, token_claims
 from app.core.security import verify_password
 from app.models.user import User
 from app.constants import user_not_found
@@ -49,7 +49,7 @@ async def create_user_endpoint(user: UserCreate, db: AsyncSession = Depends(get_
         )
 
     user = await create_user(db, user)
-    access_token = create_access_token(data={"sub": user.username})
+    access_token = create_access_token(data=token_claims(user))
     return {"access_token": access_token, "token_type": "bearer"}
 
 
@@ -60,7 +60,7 @@ async def login(user_login: UserLogin, db: AsyncSession = Depends(get_db)):
     if not user or not verify_password(user_login.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    access_token = create_access_token(data={"sub": user.username})
+    access_token = create_access_token(data=token_claims(user))
     return {"access_token": access_token, "token_type": "bearer"}
 
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 # AI schemas
 
@@ -16,3 +16,11 @@ class AIRequest(BaseModel):
 
     prompt: str
     user_id: Optional[int] = None
+
+
+class AIRecommendations(BaseModel):
+    """Names recommended by the AI, per entity type."""
+
+    tracks: List[str] = []
+    artists: List[str] = []
+    albums: List[str] = []
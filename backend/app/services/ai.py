@@ -1,12 +1,118 @@
+import asyncio
 import google.generativeai as genai
 import os
+from typing import AsyncIterator
 
 # Initialize Gemini model
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 model = genai.GenerativeModel("gemini-1.5-flash")
 
+# Gemini request limits
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "30"))
 
-def ask_gemini(prompt: str) -> str:
+
+class GeminiClient:
+    """Async Gemini client with a concurrency cap and per-request timeout.
+
+    Requests beyond ``max_concurrency`` wait in a queue; the timeout covers
+    both the wait and the generation, so a backlog of slow prompts fails
+    fast instead of piling up on the worker.
+    """
+
+    def __init__(self, model, max_concurrency: int, timeout: float):
+        self.model = model
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    async def ask(self, prompt: str) -> str:
+        """Get AI response text for a prompt."""
+        try:
+            return await asyncio.wait_for(self._generate(prompt), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+
+    async def _generate(self, prompt: str) -> str:
+        self.queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        self.in_flight += 1
+        try:
+            response = await self.model.generate_content_async(prompt)
+            self.completed += 1
+            return response.text
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Yield AI response text chunks as Gemini generates them.
+
+        The timeout applies to the queue wait and to each chunk.
+        """
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.queued -= 1
+        self.in_flight += 1
+        try:
+            response = await asyncio.wait_for(
+                self.model.generate_content_async(prompt, stream=True), self.timeout
+            )
+            chunks = aiter(response)
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(anext(chunks), self.timeout)
+                except StopAsyncIteration:
+                    break
+                yield chunk.text
+            self.completed += 1
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        """Return queue depth and request counters."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+        }
+
+
+gemini = GeminiClient(model, GEMINI_MAX_CONCURRENCY, GEMINI_TIMEOUT)
+
+
+async def ask_gemini(prompt: str) -> str:
     """Get AI response from Gemini."""
-    response = model.generate_content(prompt)
-    return response.text
+    return await gemini.ask(prompt)
+
+
+def ask_gemini_stream(prompt: str) -> AsyncIterator[str]:
+    """Stream AI response text from Gemini."""
+    return gemini.stream(prompt)
@@ -0,0 +1,141 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from sqlalchemy import insert
+from app.core import db as db_core
+from app.models.history import AiHistory
+
+# Write-behind queue for AI history rows
+HISTORY_FLUSH_INTERVAL_MS = int(os.getenv("AI_HISTORY_FLUSH_INTERVAL_MS", "200"))
+HISTORY_BATCH_SIZE = int(os.getenv("AI_HISTORY_BATCH_SIZE", "100"))
+HISTORY_QUEUE_MAXSIZE = int(os.getenv("AI_HISTORY_QUEUE_MAXSIZE", "10000"))
+
+_STOP = object()
+
+
+class HistoryWriter:
+    """Batch AiHistory rows into multi-row inserts off the request path.
+
+    Rows are queued by ``enqueue`` and written by a background task once
+    ``batch_size`` rows are waiting or ``flush_interval`` seconds have
+    passed since the first one. ``stop`` writes whatever is still queued.
+    """
+
+    def __init__(self, flush_interval: float, batch_size: int, maxsize: int):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._task: asyncio.Task | None = None
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+        self.dropped = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    def enqueue(self, user_id: int, prompt: str, result_ids: dict):
+        """Queue a history row; it is dropped if the queue is full."""
+        row = {
+            "user_id": user_id,
+            "prompt": prompt,
+            "result_ids": result_ids,
+            "created_at": datetime.now(timezone.utc),
+        }
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            print("[History] Queue full, dropping AI history row")
+
+    def start(self):
+        """Start the background writer."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background writer after writing every queued row."""
+        if self._task is not None:
+            await self._queue.put(_STOP)
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def flush(self):
+        """Write every queued row now."""
+        batch = []
+        while not self._queue.empty():
+            row = self._queue.get_nowait()
+            if row is _STOP:
+                continue
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                await self._write(batch)
+                batch = []
+        if batch:
+            await self._write(batch)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            row = await self._queue.get()
+            if row is _STOP:
+                return
+            batch = [row]
+            deadline = loop.time() + self.flush_interval
+            stopping = False
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is _STOP:
+                    stopping = True
+                    break
+                batch.append(row)
+            await self._write(batch)
+            if stopping:
+                return
+
+    async def _write(self, rows: list):
+        if db_core.SessionLocal is None:
+            db_core.init_db()
+        started = time.perf_counter()
+        async with db_core.SessionLocal() as session:
+            try:
+                await session.execute(insert(AiHistory).values(rows))
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                self.failed += len(rows)
+                print(f"[History] Failed to save {len(rows)} AI history rows: {e}")
+                return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.written += len(rows)
+        self.batches += 1
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self._total_flush_ms += elapsed_ms
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "max_flush_ms": round(self.max_flush_ms, 2),
+            "avg_flush_ms": (
+                round(self._total_flush_ms / self.batches, 2) if self.batches else 0.0
+            ),
+        }
+
+
+history_writer = HistoryWriter(
+    HISTORY_FLUSH_INTERVAL_MS / 1000, HISTORY_BATCH_SIZE, HISTORY_QUEUE_MAXSIZE
+)
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Any, Awaitable, Callable
+from app.services.prompt_cache import normalize_prompt
+
+# Background precomputation of home page recommendations
+
+# Same prompt the frontend home button sends
+DEFAULT_HOME_PROMPT = """
+Recommend 10 random tracks, 10 random artists, and 10 random albums.
+Return *only* a valid JSON object with exactly 3 keys: "tracks", "artists", and "albums".
+Each key must map to an array of names (strings).
+No explanations or extra text — only valid JSON.
+
+Example:
+{
+  "tracks": ["Track 1", "Track 2"],
+  "artists": ["Artist 1", "Artist 2"],
+  "albums": ["Album 1", "Album 2"]
+}
+"""
+
+HOME_PRECOMPUTE_INTERVAL = int(os.getenv("AI_HOME_PRECOMPUTE_INTERVAL", "1800"))
+HOME_PRECOMPUTE_VARIANTS = int(os.getenv("AI_HOME_PRECOMPUTE_VARIANTS", "3"))
+
+
+def _configured_prompts() -> list[str]:
+    """Read prompts to precompute from AI_HOME_PRECOMPUTE_PROMPTS (JSON list)."""
+    raw = os.getenv("AI_HOME_PRECOMPUTE_PROMPTS")
+    if not raw:
+        return [DEFAULT_HOME_PROMPT]
+    return [prompt for prompt in json.loads(raw) if prompt.strip()]
+
+
+class HomePrecomputer:
+    """Keeps ready-made home recommendation sets for known prompts.
+
+    A background loop recomputes ``variants`` result sets per prompt every
+    ``interval`` seconds. Reads are served from memory; a read of a set
+    older than the interval still returns it and schedules a refresh
+    (stale-while-revalidate).
+    """
+
+    def __init__(self, prompts: list[str], interval: int, variants: int):
+        self.prompts = {normalize_prompt(prompt): prompt for prompt in prompts}
+        self.interval = interval
+        self.variants = max(1, variants)
+        self._compute: Callable[[str], Awaitable[Any]] | None = None
+        self._sets: dict[str, tuple[float, list]] = {}
+        self._refreshing: dict[str, asyncio.Task] = {}
+        self._loop_task: asyncio.Task | None = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.refreshes = 0
+        self.failures = 0
+
+    def get(self, prompt: str) -> Any | None:
+        """Get a precomputed result for a prompt, or None if there is none."""
+        key = normalize_prompt(prompt)
+        entry = self._sets.get(key)
+        if entry is None:
+            return None
+
+        computed_at, results = entry
+        if time.monotonic() - computed_at > self.interval:
+            self.stale_hits += 1
+            self._refresh_in_background(key)
+        else:
+            self.hits += 1
+        return random.choice(results)
+
+    async def refresh(self, key: str):
+        """Recompute all result sets for one prompt."""
+        results = []
+        for _ in range(self.variants):
+            try:
+                result = await self._compute(self.prompts[key])
+            except Exception as e:
+                self.failures += 1
+                print(f"[Home Precompute] Failed to compute recommendations: {e!r}")
+                continue
+            if any(result["results"].values()):
+                results.append(result)
+        if results:
+            self._sets[key] = (time.monotonic(), results)
+            self.refreshes += 1
+
+    def start(self, compute: Callable[[str], Awaitable[Any]]):
+        """Start the background refresh loop."""
+        self._compute = compute
+        if self.prompts and self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop background refreshes."""
+        tasks = list(self._refreshing.values())
+        if self._loop_task is not None:
+            tasks.append(self._loop_task)
+            self._loop_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _refresh_in_background(self, key: str) -> asyncio.Task | None:
+        """Start a refresh of one prompt, or join the one in flight."""
+        if self._compute is None:
+            return None
+        task = self._refreshing.get(key)
+        if task is None:
+            task = asyncio.create_task(self.refresh(key))
+            self._refreshing[key] = task
+            task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+        return task
+
+    async def _run(self):
+        while True:
+            for key in self.prompts:
+                # Registered like read-triggered refreshes, so a stale read
+                # during this refresh does not start a second one
+                await self._refresh_in_background(key)
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {
+            "prompts": len(self.prompts),
+            "ready": len(self._sets),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+        }
+
+
+home_precomputer = HomePrecomputer(
+    _configured_prompts(), HOME_PRECOMPUTE_INTERVAL, HOME_PRECOMPUTE_VARIANTS
+)
@@ -0,0 +1,117 @@
+import math
+import os
+import zlib
+from collections import Counter
+from typing import Any
+from app.core.cache import SingleFlight, TTLCache
+
+# Prompt -> enriched AI result cache
+PROMPT_CACHE_TTL = int(os.getenv("AI_PROMPT_CACHE_TTL", "900"))
+PROMPT_CACHE_MAXSIZE = int(os.getenv("AI_PROMPT_CACHE_MAXSIZE", "512"))
+# Cosine similarity needed for a near-duplicate hit; unset means exact only
+PROMPT_CACHE_SIMILARITY = os.getenv("AI_PROMPT_CACHE_SIMILARITY")
+VECTOR_DIMENSIONS = 2**18
+# How long a request waits on an identical in-flight request before
+# falling back to its own Gemini call
+COALESCE_WAIT_TIMEOUT = float(os.getenv("AI_COALESCE_WAIT_TIMEOUT", "30"))
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Fold case and whitespace so trivially different prompts match."""
+    return " ".join(prompt.split()).casefold()
+
+
+def vectorize(text: str) -> dict[int, float]:
+    """Hash word unigrams and character trigrams into a unit sparse vector."""
+    features = text.split()
+    padded = f" {text} "
+    features += [padded[i : i + 3] for i in range(len(padded) - 2)]
+    counts = Counter(
+        zlib.crc32(feature.encode()) % VECTOR_DIMENSIONS for feature in features
+    )
+    norm = math.sqrt(sum(value * value for value in counts.values())) or 1.0
+    return {index: value / norm for index, value in counts.items()}
+
+
+def cosine(a: dict[int, float], b: dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(value * b.get(index, 0.0) for index, value in a.items())
+
+
+class PromptCache:
+    """TTL+LRU cache of AI results keyed by request kind and prompt.
+
+    Lookups first try the normalized prompt exactly. When a similarity
+    threshold is configured, a miss then falls back to the most similar
+    cached prompt of the same kind, compared as hashed n-gram vectors.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = PROMPT_CACHE_MAXSIZE,
+        ttl: int = PROMPT_CACHE_TTL,
+        similarity_threshold: float | None = None,
+    ):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.similarity_threshold = similarity_threshold
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def get(self, kind: str, prompt: str) -> Any | None:
+        normalized = normalize_prompt(prompt)
+        entry = self.cache.get((kind, normalized))
+        if entry is not None:
+            self.exact_hits += 1
+            return entry[1]
+
+        if self.similarity_threshold is not None:
+            vector = vectorize(normalized)
+            best_key, best_score = None, self.similarity_threshold
+            for key, (cached_vector, _) in self.cache.items():
+                if key[0] != kind:
+                    continue
+                score = cosine(vector, cached_vector)
+                if score >= best_score:
+                    best_key, best_score = key, score
+            if best_key is not None:
+                entry = self.cache.get(best_key)
+                if entry is not None:
+                    self.similar_hits += 1
+                    return entry[1]
+
+        self.misses += 1
+        return None
+
+    def set(self, kind: str, prompt: str, result: Any):
+        normalized = normalize_prompt(prompt)
+        vector = (
+            vectorize(normalized) if self.similarity_threshold is not None else None
+        )
+        self.cache.set((kind, normalized), (vector, result))
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self) -> dict:
+        lookups = self.exact_hits + self.similar_hits + self.misses
+        hits = self.exact_hits + self.similar_hits
+        return {
+            "size": len(self.cache),
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "evictions": self.cache.evictions,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+prompt_cache = PromptCache(
+    similarity_threshold=(
+        float(PROMPT_CACHE_SIMILARITY) if PROMPT_CACHE_SIMILARITY else None
+    )
+)
+
+# Concurrent identical prompts share one Gemini call and its enriched result
+prompt_flight = SingleFlight(wait_timeout=COALESCE_WAIT_TIMEOUT)
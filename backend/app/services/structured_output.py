@@ -0,0 +1,214 @@
+import json
+import re
+from typing import Any, Iterable, List, Tuple, Type, TypeVar
+from pydantic import BaseModel, ValidationError
+
+# Parsing of structured (JSON) LLM output
+
+Model = TypeVar("Model", bound=BaseModel)
+
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL | re.IGNORECASE)
+_LIST_MARKER_RE = re.compile(r"^(?:[-*\u2022]+|\d+[.)])\s+")
+_CLOSERS = {"{": "}", "[": "]"}
+# Tolerates raw control characters (e.g. newlines) inside strings
+_decoder = json.JSONDecoder(strict=False)
+
+
+class StructuredOutputError(ValueError):
+    """Raised when an LLM response cannot be parsed into the expected shape."""
+
+
+def extract_json(text: str) -> str:
+    """Return the JSON part of a response, from its first bracket onwards.
+
+    Code fences are stripped, including an unterminated one from a
+    truncated response; prose before the JSON is skipped.
+    """
+    match = _FENCE_RE.search(text)
+    candidate = match.group(1) if match else text
+    starts = [i for i in (candidate.find("{"), candidate.find("[")) if i != -1]
+    if not starts:
+        raise StructuredOutputError("AI response contains no JSON")
+    return candidate[min(starts) :]
+
+
+def repair_json(text: str) -> str:
+    """Fix trailing commas and close a truncated JSON value.
+
+    Truncated output is cut back to the last complete array item or
+    member, so a half-written name is dropped rather than kept.
+    Anything after the top-level value is ignored.
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = escape = False
+    safe: Tuple[int, List[str]] = (0, [])
+
+    for char in text:
+        if in_string:
+            out.append(char)
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+                if stack and stack[-1] == "[":
+                    safe = (len(out), list(stack))
+            continue
+
+        if char in "}]":
+            _strip_trailing_comma(out)
+            if stack:
+                out.append(_CLOSERS[stack.pop()])
+                safe = (len(out), list(stack))
+            if not stack:
+                break
+            continue
+
+        if char == ",":
+            safe = (len(out), list(stack))
+        elif char == '"':
+            in_string = True
+        out.append(char)
+        if char in "{[":
+            stack.append(char)
+            safe = (len(out), list(stack))
+
+    if stack or in_string:
+        length, stack = safe
+        del out[length:]
+        _strip_trailing_comma(out)
+        out.extend(_CLOSERS[opener] for opener in reversed(stack))
+    return "".join(out)
+
+
+def _strip_trailing_comma(out: List[str]):
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+def parse_json(text: str) -> Any:
+    """Parse the JSON value in an LLM response, repairing it if needed."""
+    candidate = extract_json(text)
+    try:
+        return _decoder.raw_decode(candidate)[0]
+    except ValueError:
+        pass
+    try:
+        return _decoder.decode(repair_json(candidate))
+    except ValueError as e:
+        raise StructuredOutputError(f"AI response is not valid JSON: {e}") from e
+
+
+def parse_structured(text: str, schema: Type[Model]) -> Model:
+    """Parse an LLM response and validate it against a Pydantic schema."""
+    try:
+        return schema.model_validate(parse_json(text))
+    except ValidationError as e:
+        raise StructuredOutputError(f"AI response has an invalid shape: {e}") from e
+
+
+def parse_name_list(text: str) -> List[str]:
+    """Parse a plain list of names, one per line or as a JSON array.
+
+    Bullet and numbering markers are stripped from each line.
+    """
+    stripped = text.strip()
+    if stripped.startswith(("[", "```")):
+        try:
+            data = parse_json(stripped)
+        except StructuredOutputError:
+            data = None
+        if isinstance(data, list):
+            return [str(name).strip() for name in data if str(name).strip()]
+
+    names = []
+    for line in stripped.splitlines():
+        line = line.strip()
+        if not line or line.startswith("```"):
+            continue
+        name = _LIST_MARKER_RE.sub("", line).strip()
+        if name:
+            names.append(name)
+    return names
+
+
+class IncrementalListParser:
+    """Extract array items from a streamed JSON object as soon as they close.
+
+    Fed with chunks of text shaped like ``{"tracks": ["a", "b"], ...}``
+    (optionally wrapped in a code fence), ``feed`` returns every
+    ``(key, item)`` pair whose string item was completed by that chunk.
+    Only string items of arrays directly under the top-level object are
+    reported, and only for ``keys`` when given.
+    """
+
+    def __init__(self, keys: Iterable[str] | None = None):
+        self.keys = set(keys) if keys is not None else None
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._buffer: List[str] = []
+        self._expect_key = False
+        self._current_key: str | None = None
+        self._done = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        items = []
+        for char in chunk:
+            if self._done:
+                break
+            if self._in_string:
+                self._consume_string_char(char, items)
+                continue
+            if not self._stack:
+                # Skip fences or prose before the top-level object
+                if char == "{":
+                    self._stack.append("{")
+                    self._expect_key = True
+                continue
+            if char == '"':
+                self._in_string = True
+                self._buffer = []
+            elif char in "{[":
+                self._stack.append(char)
+            elif char in "}]":
+                self._stack.pop()
+                if not self._stack:
+                    self._done = True
+            elif char == ":" and len(self._stack) == 1:
+                self._expect_key = False
+            elif char == "," and len(self._stack) == 1:
+                self._expect_key = True
+        return items
+
+    def _consume_string_char(self, char: str, items: list):
+        if self._escape:
+            self._escape = False
+            self._buffer.append(char)
+            return
+        if char == "\\":
+            self._escape = True
+            self._buffer.append(char)
+            return
+        if char != '"':
+            self._buffer.append(char)
+            return
+
+        self._in_string = False
+        value = _decode_string("".join(self._buffer))
+        if self._stack == ["{"] and self._expect_key:
+            self._current_key = value
+        elif self._stack == ["{", "["] and self._current_key is not None:
+            if self.keys is None or self._current_key in self.keys:
+                items.append((self._current_key, value))
+
+
+def _decode_string(raw: str) -> str:
+    try:
+        return json.loads(f'"{raw}"')
+    except ValueError:
+        return raw
@@ -7,11 +7,13 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sess
 from sqlalchemy.pool import NullPool
 from app.models.user import User
 from app.core.security import hash_password
+from app.core.auth import user_cache
 from httpx import AsyncClient, ASGITransport
 from app.main import app
 from pathlib import Path
 from sqlalchemy import text
 from unittest.mock import AsyncMock
+from app.services.prompt_cache import prompt_cache
 
 
 # Setup test environment
@@ -73,6 +75,22 @@ async def setup_database():
         await session.commit()
 
 
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    """Start every test with an empty authenticated user cache."""
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_ai_caches():
+    """Start every test with empty AI result caches."""
+    prompt_cache.clear()
+    yield
+    prompt_cache.clear()
+
+
 @pytest_asyncio.fixture(scope="function")
 async def db_session():
     """Create database session for test function."""
@@ -1,10 +1,10 @@
 import pytest
 from httpx import AsyncClient
-import json
 from datetime import datetime, timedelta
 from app.models.history import AiHistory
 from sqlalchemy import select
 from app.models.user import User
+from app.services.history_writer import history_writer
 
 
 @pytest.mark.asyncio
@@ -104,6 +104,7 @@ async def test_ai_companion_post_integration(
     )
     assert user is not None
 
+    await history_writer.flush()
     stmt = select(AiHistory).where(AiHistory.user_id == user.id)
     history_entries = (await db_session.execute(stmt)).scalars().all()
 
@@ -116,9 +117,7 @@ async def test_ai_companion_post_integration(
 
     assert found_entry is not None
     assert found_entry.prompt == prompt
-    saved_response = json.loads(found_entry.response)
-    assert "results" in saved_response
-    assert "tracks" in saved_response["results"]
+    assert set(found_entry.result_ids) == {"tracks", "artists", "albums"}
 
 
 @pytest.mark.asyncio
@@ -150,13 +149,13 @@ async def test_ai_companion_get_history_integration(
     entry1 = AiHistory(
         user_id=user.id,
         prompt="Integration Test Prompt 1",
-        response=json.dumps({"results": {"tracks": [{"name": "Test Track 1"}]}}),
+        result_ids={"tracks": ["track1"], "artists": [], "albums": []},
         created_at=datetime.now() - timedelta(minutes=5),
     )
     entry2 = AiHistory(
         user_id=user.id,
         prompt="Integration Test Prompt 2",
-        response=json.dumps({"results": {"artists": [{"name": "Test Artist 2"}]}}),
+        result_ids={"tracks": [], "artists": ["artist2"], "albums": []},
         created_at=datetime.now(),
     )
     db_session.add_all([entry1, entry2])
@@ -170,7 +169,26 @@ async def test_ai_companion_get_history_integration(
     assert isinstance(data, list)
     assert len(data) >= 2
 
-    assert data[0]["prompt"] == "Integration Test Prompt 1"
-    assert data[1]["prompt"] == "Integration Test Prompt 2"
-    assert data[0]["response"]["results"]["tracks"][0]["name"] == "Test Track 1"
-    assert data[1]["response"]["results"]["artists"][0]["name"] == "Test Artist 2"
+    assert data[0]["prompt"] == "Integration Test Prompt 2"
+    assert data[1]["prompt"] == "Integration Test Prompt 1"
+    assert data[0]["response"]["results"]["artists"][0]["id"] == "artist2"
+    assert data[1]["response"]["results"]["tracks"][0]["id"] == "track1"
+
+
+@pytest.mark.asyncio
+async def test_ai_stats_requires_authentication(
+    async_client: AsyncClient, create_test_user, get_auth_headers
+):
+    """
+    Tests that /ai/stats is only served to authenticated users.
+    """
+    response = await async_client.get("/ai/stats")
+    assert response.status_code == 401
+
+    username = "ai_stats_test_user"
+    await create_test_user(username=username, password="testpassword")
+    headers = await get_auth_headers(username=username, password="testpassword")
+
+    response = await async_client.get("/ai/stats", headers=headers)
+    assert response.status_code == 200
+    assert "prompt_cache" in response.json()
@@ -1,7 +1,8 @@
 import pytest
+import asyncio
 import json
 from datetime import datetime, timedelta
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 from sqlalchemy import select
 
 from app.crud.ai import (
@@ -9,8 +10,22 @@ from app.crud.ai import (
     get_recommendations_button,
     get_companion,
     get_companion_history,
+    enrich_recommendations,
+    result_ids,
+    stream_companion,
+    _summarize_ids,
+    SUMMARY_IDS_PER_REQUEST,
+)
+from app.schemas.ai import AIRecommendations, AISpecificRequest
+from app.services.ai import GeminiClient
+from app.services.history_writer import HistoryWriter, history_writer
+from app.services.structured_output import (
+    IncrementalListParser,
+    StructuredOutputError,
+    parse_json,
+    parse_name_list,
+    parse_structured,
 )
-from app.schemas.ai import AISpecificRequest
 from app.models.history import AiHistory
 
 
@@ -115,13 +130,14 @@ async def test_get_companion_success(
     prompt = "test"
     user = await create_test_user("testcompanion123", "securepassword")
 
-    result = await get_companion(db_session, prompt, user_id=user.id)
+    result = await get_companion(prompt, user_id=user.id)
 
     assert "results" in result
     assert [t["name"] for t in result["results"]["tracks"]] == ["enriched-Track X"]
     assert [t["name"] for t in result["results"]["artists"]] == ["enriched-Artist Y"]
     assert [t["name"] for t in result["results"]["albums"]] == ["enriched-Album Z"]
 
+    await history_writer.flush()
     result = await db_session.execute(
         select(AiHistory).where(AiHistory.user_id == user.id)
     )
@@ -131,29 +147,257 @@ async def test_get_companion_success(
 
 
 @pytest.mark.asyncio
-async def test_get_companion_history_success(db_session, create_test_user):
+@patch("app.crud.ai._summarize_ids")
+async def test_get_companion_history_success(
+    mock_summarize_ids, db_session, create_test_user
+):
     user = await create_test_user("testcompanionhistory", "testpassword")
+    mock_summarize_ids.return_value = {
+        ("tracks", "t1"): {"id": "t1", "name": "Track 1"}
+    }
 
     entry1 = AiHistory(
         user_id=user.id,
         prompt="p1",
-        response=json.dumps({"some": "data"}),
+        result_ids={"tracks": ["t1"], "artists": [], "albums": []},
         created_at=datetime.now() - timedelta(days=1),
     )
     entry2 = AiHistory(
         user_id=user.id,
         prompt="p2",
-        response=json.dumps({"more": "data"}),
+        result_ids={"tracks": [], "artists": ["a2"], "albums": []},
         created_at=datetime.now(),
     )
 
     db_session.add_all([entry1, entry2])
     await db_session.commit()
 
-    result = await get_companion_history(db_session, user_id=user.id)
+    result, next_cursor = await get_companion_history(db_session, user_id=user.id)
 
     assert len(result) == 2
-    assert result[0]["prompt"] == "p1"
-    assert result[1]["prompt"] == "p2"
-    assert isinstance(result[0]["response"], dict)
-    assert result[0]["response"]["some"] == "data"
+    assert next_cursor is None
+    assert result[0]["prompt"] == "p2"
+    assert result[1]["prompt"] == "p1"
+    assert result[1]["response"]["results"]["tracks"] == [
+        {"id": "t1", "name": "Track 1"}
+    ]
+    # Ids the music-service could not resolve come back bare
+    assert result[0]["response"]["results"]["artists"] == [{"id": "a2"}]
+
+    page, next_cursor = await get_companion_history(
+        db_session, user_id=user.id, limit=1, fields={"prompt"}
+    )
+    assert page == [{"prompt": "p2"}]
+    page, next_cursor = await get_companion_history(
+        db_session, user_id=user.id, limit=1, cursor=next_cursor, fields={"prompt"}
+    )
+    assert page == [{"prompt": "p1"}]
+    assert next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_summarize_ids_chunks_a_full_history_page():
+    """
+    Tests that a maximum-size history page is rehydrated in bounded requests.
+    """
+    stored = [
+        {
+            key: [f"{key}{entry:03d}{n}".ljust(22, "x") for n in range(10)]
+            for key in ("tracks", "artists", "albums")
+        }
+        for entry in range(100)
+    ]
+    requested = []
+
+    async def fake_get(path, params, timeout):
+        ids = params["ids"].split(",")
+        requested.append(ids)
+        response = Mock()
+        response.raise_for_status = Mock()
+        response.json.return_value = [{"id": id, "name": id} for id in ids]
+        return response
+
+    client = Mock()
+    client.get = fake_get
+    with patch("app.crud.ai.get_music_service_client", return_value=client):
+        summaries = await _summarize_ids(stored)
+
+    assert len(summaries) == 3000
+    assert all(len(ids) <= SUMMARY_IDS_PER_REQUEST for ids in requested)
+    assert max(len(",".join(ids)) for ids in requested) < 2000
+
+
+def test_result_ids_keeps_only_spotify_ids():
+    result = {
+        "results": {
+            "tracks": [{"id": "t1", "name": "Track 1", "image": "img"}],
+            "artists": [{"name": "No id"}],
+        }
+    }
+
+    assert result_ids(result) == {"tracks": ["t1"], "artists": [], "albums": []}
+
+
+@pytest.mark.asyncio
+@patch("app.crud.ai.search_spotify_entities")
+async def test_enrich_recommendations_partial_failure(mock_search_spotify):
+    async def enrich_mock(names, type_):
+        if type_ == "artist":
+            raise TimeoutError("music-service timed out")
+        return [{"name": f"enriched-{name}"} for name in names]
+
+    mock_search_spotify.side_effect = enrich_mock
+
+    result = await enrich_recommendations(["Track A"], ["Artist A"], [])
+
+    assert result == {
+        "tracks": [{"name": "enriched-Track A"}],
+        "artists": [],
+        "albums": [],
+    }
+    assert mock_search_spotify.call_count == 2
+
+
+class FakeModel:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+
+    async def generate_content_async(self, prompt):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(self.delay)
+        self.running -= 1
+        return type("Response", (), {"text": f"answer to {prompt}"})()
+
+
+@pytest.mark.asyncio
+async def test_gemini_client_caps_concurrency():
+    model = FakeModel(delay=0.01)
+    client = GeminiClient(model, max_concurrency=2, timeout=5)
+
+    answers = await asyncio.gather(*(client.ask(f"p{i}") for i in range(6)))
+
+    assert answers == [f"answer to p{i}" for i in range(6)]
+    assert model.max_running == 2
+    assert client.stats()["completed"] == 6
+    assert client.stats()["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_gemini_client_timeout():
+    client = GeminiClient(FakeModel(delay=1), max_concurrency=1, timeout=0.01)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await client.ask("slow")
+
+    assert client.stats()["timeouts"] == 1
+    assert client.stats()["in_flight"] == 0
+
+
+def test_incremental_list_parser_emits_completed_items():
+    parser = IncrementalListParser(["tracks", "artists", "albums"])
+    chunks = [
+        '```json\n{"tracks": ["Tra',
+        'ck A", "Track \\"B\\""], "art',
+        'ists": ["Artist A"',
+        "]}\n```",
+    ]
+
+    items = [item for chunk in chunks for item in parser.feed(chunk)]
+
+    assert items == [
+        ("tracks", "Track A"),
+        ("tracks", 'Track "B"'),
+        ("artists", "Artist A"),
+    ]
+
+
+@pytest.mark.asyncio
+@patch("app.crud.ai.ask_gemini_stream")
+@patch("app.crud.ai.search_spotify_entities")
+async def test_stream_companion_events(mock_search_spotify, mock_ask_gemini_stream):
+    async def gemini_chunks(prompt):
+        for chunk in ['{"tracks": ["Track X"', ', "Track Y"], "albums": ["Album Z"]}']:
+            yield chunk
+
+    async def enrich_mock(names, type_):
+        return [{"name": f"enriched-{name}"} for name in names]
+
+    mock_ask_gemini_stream.side_effect = gemini_chunks
+    mock_search_spotify.side_effect = enrich_mock
+
+    events = [event async for event in stream_companion("test")]
+
+    assert len(events) == 4
+    assert all(event.startswith("event: result") for event in events[:3])
+    assert events[-1].startswith("event: done")
+    done = json.loads(events[-1].split("data: ", 1)[1])
+    assert done["results"] == {
+        "tracks": [{"name": "enriched-Track X"}, {"name": "enriched-Track Y"}],
+        "artists": [],
+        "albums": [{"name": "enriched-Album Z"}],
+    }
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ('```json\n{"tracks": ["A", "B",],}\n```', {"tracks": ["A", "B"]}),
+        ('Sure! {"tracks": ["A"]} Enjoy.', {"tracks": ["A"]}),
+        ('{"tracks": ["A", "B', {"tracks": ["A"]}),
+        ('```json\n{"tracks": ["A"], "albums": [', {"tracks": ["A"], "albums": []}),
+    ],
+)
+def test_parse_json_repairs_llm_output(text, expected):
+    assert parse_json(text) == expected
+
+
+def test_parse_structured_rejects_invalid_output():
+    with pytest.raises(StructuredOutputError):
+        parse_structured("I cannot help with that.", AIRecommendations)
+    with pytest.raises(StructuredOutputError):
+        parse_structured('{"tracks": "not a list"}', AIRecommendations)
+
+
+def test_parse_name_list():
+    assert parse_name_list("1. Song A\n2) Song B\n- Song C\n\n") == [
+        "Song A",
+        "Song B",
+        "Song C",
+    ]
+    assert parse_name_list('```json\n["Song A", "Song B"]\n```') == [
+        "Song A",
+        "Song B",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_history_writer_batches_rows():
+    writer = HistoryWriter(flush_interval=0.01, batch_size=2, maxsize=10)
+    batches = []
+
+    async def record(rows):
+        batches.append([row["prompt"] for row in rows])
+
+    writer._write = record
+    writer.start()
+    for prompt in ["p1", "p2", "p3"]:
+        writer.enqueue(1, prompt, "{}")
+    await asyncio.sleep(0.05)
+    writer.enqueue(1, "p4", "{}")
+    await writer.stop()
+
+    assert batches == [["p1", "p2"], ["p3"], ["p4"]]
+    assert writer.stats()["queue_depth"] == 0
+
+
+def test_history_writer_drops_rows_when_full():
+    writer = HistoryWriter(flush_interval=1, batch_size=10, maxsize=1)
+
+    writer.enqueue(1, "p1", "{}")
+    writer.enqueue(1, "p2", "{}")
+
+    assert writer.stats()["queue_depth"] == 1
+    assert writer.stats()["dropped"] == 1
@@ -4,6 +4,10 @@ from app.crud import user as crud_user
 from app.schemas.user import UserCreate, UserUpdate, UserReplace, PasswordChange
 from app.models.user import User
 from app.core.security import verify_password
+from app.core import auth
+from app.core.auth import create_access_token, get_current_user
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
 
 
 @pytest.mark.asyncio
@@ -219,3 +223,60 @@ async def test_change_password_failure(mock_db):
     assert result is False
     mock_db.commit.assert_not_called()
     mock_db.refresh.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_is_cached(mock_db):
+    user = User(
+        id=1,
+        username="test_user_cached",
+        email="test_user_cached@example.com",
+        hashed_password="hashed",
+    )
+    credentials = HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=create_access_token({"sub": user.username})
+    )
+
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = user
+    mock_db.execute.return_value = mock_result
+
+    first = await get_current_user(credentials, mock_db)
+    second = await get_current_user(credentials, mock_db)
+
+    assert first is user
+    assert second is not user
+    assert (second.id, second.username) == (1, "test_user_cached")
+    mock_db.execute.assert_called_once()
+
+    await crud_user.update_user(mock_db, user.id, UserUpdate(email="new@example.com"))
+    await get_current_user(credentials, mock_db)
+
+    assert mock_db.execute.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_token_version_claims_are_opt_in(mock_db, monkeypatch):
+    user = User(
+        id=7,
+        username="test_user_claims",
+        email="test_user_claims@example.com",
+        hashed_password="hashed",
+        token_version=2,
+    )
+
+    assert auth.token_claims(user) == {"sub": "test_user_claims"}
+    monkeypatch.setattr(auth, "JWT_USER_CLAIMS", True)
+    assert auth.token_claims(user) == {"sub": "test_user_claims", "uid": 7, "ver": 2}
+
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = user
+    mock_db.execute.return_value = mock_result
+    stale = HTTPAuthorizationCredentials(
+        scheme="Bearer",
+        credentials=create_access_token({**auth.token_claims(user), "ver": 1}),
+    )
+
+    with pytest.raises(HTTPException) as exc:
+        await get_current_user(stale, mock_db)
+    assert exc.value.status_code == 401
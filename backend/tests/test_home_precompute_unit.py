@@ -0,0 +1,81 @@
+import asyncio
+import time
+import pytest
+from app.services.home_precompute import HomePrecomputer
+
+
+def _result(name):
+    return {"results": {"tracks": [{"name": name}], "artists": [], "albums": []}}
+
+
+@pytest.mark.asyncio
+async def test_precomputed_result_served_without_compute():
+    calls = []
+
+    async def compute(prompt):
+        calls.append(prompt)
+        return _result("Song 1")
+
+    precomputer = HomePrecomputer(["Recommend  songs"], interval=60, variants=1)
+    precomputer.start(compute)
+    await asyncio.sleep(0.01)
+    await precomputer.stop()
+
+    assert precomputer.get("recommend songs") == _result("Song 1")
+    assert precomputer.get("unknown prompt") is None
+    assert calls == ["Recommend  songs"]
+
+
+@pytest.mark.asyncio
+async def test_stale_result_served_while_refreshing():
+    names = iter(["old", "new"])
+
+    async def compute(prompt):
+        return _result(next(names))
+
+    precomputer = HomePrecomputer(["home"], interval=0, variants=1)
+    precomputer._compute = compute
+    await precomputer.refresh("home")
+
+    assert precomputer.get("home") == _result("old")
+    await asyncio.sleep(0.01)
+    assert precomputer.get("home") == _result("new")
+    assert precomputer.stats()["stale_hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_previous_sets():
+    async def compute(prompt):
+        raise RuntimeError("Gemini error")
+
+    precomputer = HomePrecomputer(["home"], interval=60, variants=2)
+    precomputer._sets["home"] = (0.0, [_result("kept")])
+    precomputer._compute = compute
+    await precomputer.refresh("home")
+
+    assert precomputer._sets["home"][1] == [_result("kept")]
+    assert precomputer.stats()["failures"] == 2
+
+
+@pytest.mark.asyncio
+async def test_read_during_loop_refresh_joins_it():
+    calls = []
+    release = asyncio.Event()
+
+    async def compute(prompt):
+        calls.append(prompt)
+        await release.wait()
+        return _result(f"Song {len(calls)}")
+
+    precomputer = HomePrecomputer(["home"], interval=60, variants=2)
+    precomputer._sets["home"] = (time.monotonic() - 120, [_result("stale")])
+    precomputer.start(compute)
+    await asyncio.sleep(0.01)
+
+    assert precomputer.get("home") == _result("stale")
+    release.set()
+    await asyncio.sleep(0.01)
+    await precomputer.stop()
+
+    assert len(calls) == 2
+    assert precomputer.stats()["refreshes"] == 1
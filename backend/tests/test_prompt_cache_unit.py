@@ -0,0 +1,93 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from app.core.cache import SingleFlight
+from app.crud.ai import get_recommendations_button
+from app.schemas.ai import AISpecificRequest
+from app.services.prompt_cache import PromptCache
+
+
+def test_prompt_cache_exact_hit_after_normalization():
+    cache = PromptCache(maxsize=10, ttl=60)
+    cache.set("home", "Recommend  10 tracks", {"results": ["a"]})
+
+    assert cache.get("home", "  recommend 10 TRACKS ") == {"results": ["a"]}
+    assert cache.get("companion", "recommend 10 tracks") is None
+    assert cache.stats()["exact_hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_prompt_cache_similarity_hit():
+    cache = PromptCache(maxsize=10, ttl=60, similarity_threshold=0.9)
+    cache.set("companion", "give me chill lofi beats to study to", {"results": 1})
+
+    assert cache.get("companion", "give me chill lofi beats to study to!") == {
+        "results": 1
+    }
+    assert cache.get("companion", "heavy metal for the gym") is None
+    assert cache.stats()["similar_hits"] == 1
+
+
+def test_prompt_cache_similarity_disabled_by_default():
+    cache = PromptCache(maxsize=10, ttl=60)
+    cache.set("companion", "give me chill lofi beats to study to", {"results": 1})
+
+    assert cache.get("companion", "give me chill lofi beats to study to!") is None
+
+
+@pytest.mark.asyncio
+@patch("app.crud.ai.ask_gemini")
+@patch("app.crud.ai.search_spotify_entities")
+async def test_repeated_prompt_skips_gemini(mock_search_spotify, mock_ask_gemini):
+    mock_ask_gemini.return_value = "- Song 1"
+    mock_search_spotify.return_value = [{"name": "enriched-Song 1"}]
+    request = AISpecificRequest(prompt="songs like cached prompt test", type="track")
+
+    first = await get_recommendations_button(request)
+    second = await get_recommendations_button(request)
+
+    assert first == second == {"results": [{"name": "enriched-Song 1"}]}
+    mock_ask_gemini.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("app.crud.ai.ask_gemini")
+@patch("app.crud.ai.search_spotify_entities")
+async def test_concurrent_identical_prompts_share_one_call(
+    mock_search_spotify, mock_ask_gemini
+):
+    async def slow_gemini(prompt):
+        await asyncio.sleep(0.02)
+        return "- Song 1"
+
+    mock_ask_gemini.side_effect = slow_gemini
+    mock_search_spotify.return_value = []
+    request = AISpecificRequest(prompt="songs like coalescing test", type="track")
+
+    results = await asyncio.gather(
+        *(get_recommendations_button(request) for _ in range(5))
+    )
+
+    assert results == [{"results": []}] * 5
+    mock_ask_gemini.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_single_flight_falls_back_when_shared_call_fails():
+    flight = SingleFlight(wait_timeout=1)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        if len(calls) == 1:
+            raise RuntimeError("Gemini error")
+        return "ok"
+
+    results = await asyncio.gather(
+        flight.do("key", compute), flight.do("key", compute), return_exceptions=True
+    )
+
+    assert isinstance(results[0], RuntimeError)
+    assert results[1] == "ok"
+    assert flight.stats()["fallbacks"] == 1
@@ -39,7 +39,8 @@ export default function Companion() {
         console.log(history);
         const formattedMessages: Message[] = [];
 
-        for (const entry of history) {
+        // History comes newest first; show it in chronological order
+        for (const entry of [...history].reverse()) {
           formattedMessages.push({
             id: uuidv4(),
             sender: "user",
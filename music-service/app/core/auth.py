@@ -6,6 +6,7 @@ from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.models.user import User
 from app.core.db import get_db
+from app.core.cache import MISSING, TTLCache
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
@@ -15,6 +16,29 @@ SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 ALGORITHM = "HS256"
 security = HTTPBearer(auto_error=False)
 
+# Authenticated user cache, username -> column values. Account changes
+# happen in the backend, so entries here only expire through the TTL.
+USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", "30"))
+USER_CACHE_MAXSIZE = int(os.getenv("AUTH_USER_CACHE_MAXSIZE", "1024"))
+USER_COLUMNS = ("id", "username", "email", "hashed_password", "token_version")
+user_cache = TTLCache(maxsize=USER_CACHE_MAXSIZE, ttl=USER_CACHE_TTL)
+
+# Stateless mode: trust the uid/ver claims of verified tokens and only
+# check the version against a cached users.token_version (None if deleted)
+AUTH_STATELESS = os.getenv("AUTH_STATELESS", "false").lower() == "true"
+TOKEN_VERSION_CACHE_TTL = int(os.getenv("AUTH_TOKEN_VERSION_CACHE_TTL", "30"))
+token_version_cache = TTLCache(maxsize=USER_CACHE_MAXSIZE, ttl=TOKEN_VERSION_CACHE_TTL)
+
+
+async def _get_token_version(db: AsyncSession, user_id: int) -> int | None:
+    """Get a user's current token version, cached per user id."""
+    version = token_version_cache.get(user_id, MISSING)
+    if version is MISSING:
+        result = await db.execute(select(User.token_version).where(User.id == user_id))
+        version = result.scalar_one_or_none()
+        token_version_cache.set(user_id, version)
+    return version
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
@@ -32,11 +56,31 @@ async def get_current_user(
                 status_code=401, detail="Could not validate credentials"
             )
 
-        result = await db.execute(select(User).filter(User.username == username))
-        user = result.scalar_one_or_none()
-        if user is None:
-            raise HTTPException(status_code=401, detail="User not found")
+        if AUTH_STATELESS and "uid" in payload and "ver" in payload:
+            version = await _get_token_version(db, payload["uid"])
+            if version is None:
+                raise HTTPException(status_code=401, detail="User not found")
+            if payload["ver"] != version:
+                raise HTTPException(status_code=401, detail="Token has been revoked")
+            # Only the claims are known; email and password hash stay unset
+            return User(id=payload["uid"], username=username, token_version=version)
+
+        cached = user_cache.get(username)
+        if cached is not None:
+            # Detached copy, so callers never share or mutate the cached state
+            user = User(**cached)
+        else:
+            result = await db.execute(select(User).filter(User.username == username))
+            user = result.scalar_one_or_none()
+            if user is None:
+                raise HTTPException(status_code=401, detail="User not found")
+
+            user_cache.set(
+                username, {column: getattr(user, column) for column in USER_COLUMNS}
+            )
 
+        if "ver" in payload and payload["ver"] != user.token_version:
+            raise HTTPException(status_code=401, detail="Token has been revoked")
         return user
     except JoseError:
         raise HTTPException(status_code=401, detail="Could not validate credentials")
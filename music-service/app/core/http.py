@@ -0,0 +1,71 @@
+import os
+import httpx
+
+# Shared upstream HTTP clients
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# One pooled client per upstream host, so each gets its own connection limits
+UPSTREAMS = {
+    "spotify": "https://api.spotify.com",
+    "spotify_accounts": "https://accounts.spotify.com",
+    "deezer": "https://api.deezer.com",
+}
+
+_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def _env_int(name: str, upstream: str, default: int) -> int:
+    """Read a per-upstream setting, falling back to the global one."""
+    value = os.getenv(f"{upstream.upper()}_{name}") or os.getenv(f"HTTP_{name}")
+    return int(value) if value else default
+
+
+def _env_float(name: str, upstream: str, default: float) -> float:
+    value = os.getenv(f"{upstream.upper()}_{name}") or os.getenv(f"HTTP_{name}")
+    return float(value) if value else default
+
+
+def _create_client(upstream: str) -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=_env_int("MAX_CONNECTIONS", upstream, 50),
+        max_keepalive_connections=_env_int("MAX_KEEPALIVE", upstream, 20),
+        keepalive_expiry=_env_float("KEEPALIVE_EXPIRY", upstream, 30.0),
+    )
+    timeout = httpx.Timeout(
+        _env_float("TIMEOUT", upstream, 10.0),
+        connect=_env_float("CONNECT_TIMEOUT", upstream, 5.0),
+    )
+    return httpx.AsyncClient(
+        base_url=UPSTREAMS[upstream],
+        limits=limits,
+        timeout=timeout,
+        http2=HTTP2_AVAILABLE,
+    )
+
+
+def get_http_client(upstream: str) -> httpx.AsyncClient:
+    """Get the pooled client for an upstream, creating it on first use."""
+    client = _clients.get(upstream)
+    if client is None or client.is_closed:
+        client = _create_client(upstream)
+        _clients[upstream] = client
+    return client
+
+
+async def init_http_clients():
+    """Open pooled clients for all upstreams."""
+    for upstream in UPSTREAMS:
+        get_http_client(upstream)
+
+
+async def close_http_clients():
+    """Close all pooled clients."""
+    for client in _clients.values():
+        await client.aclose()
+    _clients.clear()
@@ -1,18 +1,56 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import asc, desc
+from sqlalchemy import asc, delete, desc, exists, func, tuple_
+from sqlalchemy.dialects.postgresql import insert
 from app.models.favorite import Favorite, FavoriteType
-from typing import List, Any, Callable, Optional
+from app.schemas.favorite import FavoriteItem
+from typing import List, Any, Awaitable, Callable, Optional
 from app.services.spotify import (
     get_tracks_by_ids,
     get_artists_by_ids,
     get_albums_by_ids,
+    MAX_TRACKS_PER_REQUEST,
+    MAX_ARTISTS_PER_REQUEST,
+    MAX_ALBUMS_PER_REQUEST,
 )
+from app.services.spotify_search import summarize_entity
 from fastapi import HTTPException
+from app.core.cache import TTLCache
+from app.core.pagination import decode_cursor, encode_cursor
 import asyncio
+import os
 
 # Favorite CRUD operations
 
+# Maximum concurrent Spotify requests per favorites type
+SPOTIFY_BATCH_CONCURRENCY = int(os.getenv("SPOTIFY_BATCH_CONCURRENCY", "4"))
+
+FAVORITES_PAGE_SIZE = 50
+# (user_id, type or None) -> favorites count, dropped on every write
+favorite_counts = TTLCache(
+    maxsize=int(os.getenv("FAVORITE_COUNT_CACHE_MAXSIZE", "10000")),
+    ttl=int(os.getenv("FAVORITE_COUNT_CACHE_TTL", "300")),
+)
+
+
+def _invalidate_counts(user_id: int):
+    favorite_counts.delete((user_id, None))
+    for favorite_type in FavoriteType:
+        favorite_counts.delete((user_id, favorite_type))
+
+
+def _parse_favorite_type(type: Optional[str]) -> FavoriteType:
+    """Map a type string to FavoriteType, raising 400 if missing or invalid."""
+    if not type:
+        raise HTTPException(status_code=400, detail="Favorite type is required.")
+    try:
+        return FavoriteType[type]
+    except (TypeError, KeyError):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid favorite type: '{type}'. Must be 'track', 'album', or 'artist'.",
+        )
+
 
 async def create_favorite(
     user_id: int,
@@ -20,38 +58,85 @@ async def create_favorite(
     db: AsyncSession,
     type: Optional[str] = None,
 ):
-    """Create a new favorite."""
-    result = await db.execute(
-        select(Favorite).where(
-            Favorite.user_id == user_id,
-            Favorite.spotify_id == spotify_id,
-        )
+    """Create a new favorite, returning False if it already exists.
+
+    A single INSERT ... ON CONFLICT DO NOTHING RETURNING on the
+    (user_id, type, spotify_id) unique index, so concurrent adds of the
+    same favorite cannot create duplicates.
+    """
+    favorite_type_enum = _parse_favorite_type(type)
+    stmt = (
+        insert(Favorite)
+        .values(user_id=user_id, spotify_id=spotify_id, type=favorite_type_enum)
+        .on_conflict_do_nothing(index_elements=["user_id", "type", "spotify_id"])
+        .returning(Favorite.id)
     )
-    existing = result.scalar_one_or_none()
-    if existing:
+    result = await db.execute(stmt)
+    if result.scalar_one_or_none() is None:
         return False
+    await db.commit()
+    _invalidate_counts(user_id)
+    return True
 
-    favorite_type_enum = None
-    if type:
-        try:
-            favorite_type_enum = FavoriteType[type]
-        except (TypeError, KeyError):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid favorite type: '{type}'. Must be 'track', 'album', or 'artist'.",
-            )
-    else:
-        raise HTTPException(status_code=400, detail="Favorite type is required.")
 
-    new_favorite = Favorite(
-        user_id=user_id,
-        spotify_id=spotify_id,
-        type=favorite_type_enum,
+async def create_favorites_bulk(
+    user_id: int, items: List[FavoriteItem], db: AsyncSession
+) -> List[bool]:
+    """Create many favorites in one multi-row insert.
+
+    Returns, per input item, whether it was newly created; existing
+    favorites and repeats within the request come back False.
+    """
+    keys = list(dict.fromkeys((item.spotify_id, item.type) for item in items))
+    stmt = (
+        insert(Favorite)
+        .values(
+            [
+                {"user_id": user_id, "spotify_id": spotify_id, "type": type}
+                for spotify_id, type in keys
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "type", "spotify_id"])
+        .returning(Favorite.spotify_id, Favorite.type)
     )
-    db.add(new_favorite)
+    result = await db.execute(stmt)
+    created = {(row.spotify_id, row.type) for row in result}
     await db.commit()
-    await db.refresh(new_favorite)
-    return True
+    _invalidate_counts(user_id)
+    return _claim_outcomes(items, created)
+
+
+async def erase_favorites_bulk(
+    user_id: int, items: List[FavoriteItem], db: AsyncSession
+) -> List[bool]:
+    """Delete many favorites in one statement.
+
+    Returns, per input item, whether it was deleted.
+    """
+    keys = list(dict.fromkeys((item.spotify_id, item.type) for item in items))
+    stmt = (
+        delete(Favorite)
+        .where(
+            Favorite.user_id == user_id,
+            tuple_(Favorite.spotify_id, Favorite.type).in_(keys),
+        )
+        .returning(Favorite.spotify_id, Favorite.type)
+    )
+    result = await db.execute(stmt)
+    deleted = {(row.spotify_id, row.type) for row in result}
+    await db.commit()
+    _invalidate_counts(user_id)
+    return _claim_outcomes(items, deleted)
+
+
+def _claim_outcomes(items: List[FavoriteItem], affected: set) -> List[bool]:
+    """Map affected (spotify_id, type) keys back to items, first match wins."""
+    outcomes = []
+    for item in items:
+        key = (item.spotify_id, item.type)
+        outcomes.append(key in affected)
+        affected.discard(key)
+    return outcomes
 
 
 async def get_all_favorites(
@@ -76,23 +161,109 @@ async def get_all_user_favorites(
     return result.scalars().all()
 
 
-async def _fetch_spotify_data_in_batches_threaded(
-    spotify_ids: List[str], fetch_func_sync: Callable[[List[str]], Any], batch_size: int
+def _user_favorites_query(
+    user_id: int,
+    cursor: Optional[str] = None,
+    type: Optional[str] = None,
+    ascending: bool = False,
+):
+    """Select a user's favorites ordered by (created_at, id), after ``cursor``."""
+    query = select(Favorite).where(Favorite.user_id == user_id)
+    if type:
+        query = query.where(Favorite.type == _parse_favorite_type(type))
+    if cursor is not None:
+        key = tuple_(Favorite.created_at, Favorite.id)
+        created_at, id = decode_cursor(cursor)
+        position = tuple_(created_at, id)
+        query = query.where(key > position if ascending else key < position)
+    direction = asc if ascending else desc
+    return query.order_by(direction(Favorite.created_at), direction(Favorite.id))
+
+
+async def get_user_favorites_page(
+    user_id: int,
+    db: AsyncSession,
+    limit: int = FAVORITES_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    type: Optional[str] = None,
+    ascending: bool = False,
 ):
-    """Fetch Spotify data in concurrent batches."""
+    """Get a page of a user's favorites ordered by (created_at, id).
+
+    Newest first unless ``ascending``. Returns the favorites and the
+    cursor of the next page, or None on the last one.
+    """
+    query = _user_favorites_query(user_id, cursor, type, ascending).limit(limit + 1)
+    result = await db.execute(query)
+    favorites = result.scalars().all()
+    next_cursor = None
+    if len(favorites) > limit:
+        favorites = favorites[:limit]
+        next_cursor = encode_cursor(favorites[-1].created_at, favorites[-1].id)
+    return favorites, next_cursor
+
+
+async def count_user_favorites(
+    user_id: int, db: AsyncSession, type: Optional[str] = None
+) -> int:
+    """Count a user's favorites, served from a cache dropped on writes."""
+    favorite_type = _parse_favorite_type(type) if type else None
+    key = (user_id, favorite_type)
+    count = favorite_counts.get(key)
+    if count is None:
+        query = select(func.count()).where(Favorite.user_id == user_id)
+        if favorite_type:
+            query = query.where(Favorite.type == favorite_type)
+        count = (await db.execute(query)).scalar_one()
+        favorite_counts.set(key, count)
+    return count
+
+
+async def _fetch_spotify_data_in_batches(
+    spotify_ids: List[str],
+    fetch_func: Callable[[List[str]], Awaitable[List[Any]]],
+    batch_size: int,
+):
+    """Fetch Spotify data in concurrent batches, preserving input order."""
     if not spotify_ids:
         return []
 
-    # For testing, we'll just call the function directly
-    # This avoids race conditions with our mocks
-    return fetch_func_sync(spotify_ids)
+    chunks = [
+        spotify_ids[i : i + batch_size] for i in range(0, len(spotify_ids), batch_size)
+    ]
+    semaphore = asyncio.Semaphore(SPOTIFY_BATCH_CONCURRENCY)
 
+    async def fetch_chunk(chunk: List[str]):
+        async with semaphore:
+            return await fetch_func(chunk)
 
-async def get_spotify_metadata_for_user_favorites(user_id: int, db: AsyncSession):
-    """Get Spotify metadata for all user favorites."""
+    results = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
+    return [item for chunk_result in results for item in chunk_result]
 
-    # Get all favorites
-    favorites = await get_all_user_favorites(user_id, db)
+
+async def get_spotify_metadata_for_user_favorites(
+    user_id: int,
+    db: AsyncSession,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    type: Optional[str] = None,
+    summary: bool = False,
+):
+    """Get Spotify metadata for user favorites.
+
+    Without ``limit`` every favorite is enriched. With it, one page of
+    favorites (newest first) is enriched and the next page's cursor is
+    returned alongside. ``summary`` reduces each item to the fields the
+    UI renders instead of the full Spotify object.
+    """
+    next_cursor = None
+    if limit is None:
+        result = await db.execute(_user_favorites_query(user_id, cursor, type))
+        favorites = result.scalars().all()
+    else:
+        favorites, next_cursor = await get_user_favorites_page(
+            user_id, db, limit=limit, cursor=cursor, type=type
+        )
 
     # Group favorites by type
     grouped = {"tracks": [], "artists": [], "albums": []}
@@ -101,15 +272,15 @@ async def get_spotify_metadata_for_user_favorites(user_id: int, db: AsyncSession
         if fav.type and plural_type_key in grouped:
             grouped[plural_type_key].append(fav.spotify_id)
 
-    # Fetch data in parallel
-    tracks_task = _fetch_spotify_data_in_batches_threaded(
-        grouped["tracks"], get_tracks_by_ids, 20
+    # Fetch data in parallel; cached metadata is served without a request
+    tracks_task = _fetch_spotify_data_in_batches(
+        grouped["tracks"], get_tracks_by_ids, MAX_TRACKS_PER_REQUEST
     )
-    artists_task = _fetch_spotify_data_in_batches_threaded(
-        grouped["artists"], get_artists_by_ids, 20
+    artists_task = _fetch_spotify_data_in_batches(
+        grouped["artists"], get_artists_by_ids, MAX_ARTISTS_PER_REQUEST
     )
-    albums_task = _fetch_spotify_data_in_batches_threaded(
-        grouped["albums"], get_albums_by_ids, 20
+    albums_task = _fetch_spotify_data_in_batches(
+        grouped["albums"], get_albums_by_ids, MAX_ALBUMS_PER_REQUEST
     )
 
     # Wait for all tasks
@@ -123,50 +294,62 @@ async def get_spotify_metadata_for_user_favorites(user_id: int, db: AsyncSession
         "artists": artists,
         "albums": albums,
     }
+    if summary:
+        metadata = {
+            key: [summarize_entity(item, key[:-1]) for item in items if item]
+            for key, items in metadata.items()
+        }
 
-    return metadata
+    return metadata, next_cursor
+
+
+def _favorite_conditions(user_id: int, spotify_id: str, type: Optional[str]):
+    """WHERE conditions matching one favorite, of any type if none is given."""
+    conditions = [Favorite.user_id == user_id, Favorite.spotify_id == spotify_id]
+    if type:
+        conditions.append(Favorite.type == _parse_favorite_type(type))
+    return conditions
 
 
 async def get_favorite(
     user_id: int, spotify_id: str, db: AsyncSession, type: str = None
-):
-    query = select(Favorite).where(
-        Favorite.user_id == user_id,
-        Favorite.spotify_id == spotify_id,
+) -> bool:
+    """Check whether an item is favorited, without loading the row."""
+    query = select(exists().where(*_favorite_conditions(user_id, spotify_id, type)))
+    result = await db.execute(query)
+    return bool(result.scalar())
+
+
+async def get_favorited_ids(
+    user_id: int,
+    spotify_ids: List[str],
+    db: AsyncSession,
+    type: Optional[FavoriteType] = None,
+) -> set:
+    """Get which of the given Spotify ids the user has favorited."""
+    query = select(Favorite.spotify_id).where(
+        Favorite.user_id == user_id, Favorite.spotify_id.in_(spotify_ids)
     )
     if type:
-        try:
-            query = query.where(Favorite.type == FavoriteType[type])
-        except KeyError:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid favorite type: '{type}'. Must be 'track', 'album', or 'artist'.",
-            )
+        query = query.where(Favorite.type == type)
     result = await db.execute(query)
-    return result.scalar_one_or_none()
+    return set(result.scalars().all())
 
 
 async def erase_favorite(
     user_id: int, spotify_id: str, db: AsyncSession, type: str = None
-):
-    query = select(Favorite).where(
-        Favorite.user_id == user_id,
-        Favorite.spotify_id == spotify_id,
+) -> bool:
+    """Delete a favorite with a single DELETE ... RETURNING."""
+    stmt = (
+        delete(Favorite)
+        .where(*_favorite_conditions(user_id, spotify_id, type))
+        .returning(Favorite.id)
     )
-    if type:
-        try:
-            query = query.where(Favorite.type == FavoriteType[type])
-        except KeyError:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid favorite type: '{type}'. Must be 'track', 'album', or 'artist'.",
-            )
-    result = await db.execute(query)
-    favorite = result.scalar_one_or_none()
-    if not favorite:
+    result = await db.execute(stmt)
+    if not result.scalars().all():
         return False
-    await db.delete(favorite)
     await db.commit()
+    _invalidate_counts(user_id)
     return True
 
 
@@ -6,22 +6,38 @@ from app.routers import (
     deezer,
 )
 from app.services import deezer_genres
+from app.core.http import init_http_clients, close_http_clients
 from contextlib import asynccontextmanager
+import asyncio
+import contextlib
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup: open pooled upstream clients
+    await init_http_clients()
+
+    # Serve genres from the snapshot right away, refresh from Deezer behind it
+    deezer_genres.load_genres_snapshot()
+    genre_refresh = asyncio.create_task(deezer_genres.refresh_deezer_genres())
+
+    yield
+
+    # Shutdown: stop background work and close pooled upstream clients
+    genre_refresh.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await genre_refresh
+    await close_http_clients()
 
 
 app = FastAPI(
     title="TuneQuest Music Service",
     description="Microservice handling all music-related operations",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    deezer_genres.load_deezer_genres()
-    yield
-
-
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -29,6 +45,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 # Include routers
 app.include_router(user_favorites.router)
@@ -1,25 +1,31 @@
 from fastapi import APIRouter, HTTPException, status
-from app.services.deezer import fetch_deezer_genres, fetch_deezer_preview_url
+from app.services.deezer import (
+    fetch_deezer_genres,
+    fetch_deezer_preview_url,
+    fetch_deezer_preview_urls,
+    search_cache_stats,
+)
+from app.schemas.deezer import DeezerPreviewBatch
 
 # Deezer API endpoints
 router = APIRouter(prefix="/deezer", tags=["deezer"])
 
 
 @router.get("/genres")
-def get_deezer_genres(album: str, artist: str):
+async def get_deezer_genres(album: str, artist: str):
     """Get Deezer genre info."""
     try:
-        genre_name = fetch_deezer_genres(album, artist)
+        genre_name = await fetch_deezer_genres(album, artist)
         return {"genre": genre_name}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/tracks")
-def get_deezer_preview_url(track: str, artist: str):
+async def get_deezer_preview_url(track: str, artist: str):
     """Get Deezer track preview URL."""
     try:
-        preview_url = fetch_deezer_preview_url(track, artist)
+        preview_url = await fetch_deezer_preview_url(track, artist)
         if not preview_url:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Preview not found"
@@ -27,3 +33,18 @@ def get_deezer_preview_url(track: str, artist: str):
         return {"preview_url": preview_url}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/tracks/batch")
+async def get_deezer_preview_urls(batch: DeezerPreviewBatch):
+    """Get Deezer track preview URLs for several tracks."""
+    previews, errors = await fetch_deezer_preview_urls(
+        [(item.key, item.track, item.artist) for item in batch.items]
+    )
+    return {"previews": previews, "errors": errors}
+
+
+@router.get("/stats")
+async def get_deezer_stats():
+    """Get Deezer search cache counters."""
+    return {"search": search_cache_stats()}
@@ -1,134 +1,161 @@
 from fastapi import APIRouter, Query, HTTPException
-import requests
+import httpx
 from typing import List
 from app.services.spotify import (
     get_tracks_by_ids,
     get_artists_by_ids,
     get_albums_by_ids,
-    get_spotify_access_token,
+    spotify_get,
 )
-from app.services.spotify_search import search_spotify_entities
+from app.services.spotify_search import (
+    search_spotify_entities,
+    search_cache,
+    summarize_entities_by_ids,
+)
+from app.services.spotify_token import token_manager
+from app.services.metadata_cache import metadata_cache
 
 # Spotify API endpoints
 router = APIRouter(prefix="/spotify", tags=["spotify"])
 
 
+async def _get_or_502(path: str, detail: str, params: dict | None = None):
+    """Proxy a Spotify GET request, mapping upstream failures to 502."""
+    try:
+        response = await spotify_get(path, params=params)
+    except httpx.HTTPError:
+        raise HTTPException(status_code=502, detail=detail)
+    if response.status_code != 200:
+        raise HTTPException(status_code=502, detail=detail)
+    return response.json()
+
+
+def _split_ids(ids: List[str]) -> List[str]:
+    """Accept both repeated and comma-separated ``ids`` query values."""
+    return [i for value in ids for i in value.split(",") if i]
+
+
 @router.get("/track/{id}")
-def get_track(id: str):
+async def get_track(id: str):
     """Get Spotify track info."""
-    token = get_spotify_access_token()
-    response = requests.get(
-        f"https://api.spotify.com/v1/tracks/{id}",
-        headers={"Authorization": f"Bearer {token}"},
+    return await metadata_cache.get(
+        "track",
+        id,
+        lambda: _get_or_502(f"/v1/tracks/{id}", "Failed to fetch track info"),
     )
-    if response.status_code != 200:
-        raise HTTPException(status_code=502, detail="Failed to fetch track info")
-    return response.json()
 
 
 @router.get("/artist/{id}")
-def get_artist(id: str):
+async def get_artist(id: str):
     """Get Spotify artist info."""
-    token = get_spotify_access_token()
-    response = requests.get(
-        f"https://api.spotify.com/v1/artists/{id}",
-        headers={"Authorization": f"Bearer {token}"},
+    return await metadata_cache.get(
+        "artist",
+        id,
+        lambda: _get_or_502(f"/v1/artists/{id}", "Failed to fetch artist info"),
     )
-    if response.status_code != 200:
-        raise HTTPException(status_code=502, detail="Failed to fetch artist info")
-    return response.json()
 
 
 @router.get("/artist/{id}/top-tracks")
-def get_artist_top_tracks(id: str, market: str = "US"):
+async def get_artist_top_tracks(id: str, market: str = "US"):
     """Get artist's top tracks."""
-    token = get_spotify_access_token()
-    response = requests.get(
-        f"https://api.spotify.com/v1/artists/{id}/top-tracks?market={market}",
-        headers={"Authorization": f"Bearer {token}"},
+    return await _get_or_502(
+        f"/v1/artists/{id}/top-tracks",
+        "Failed to fetch top tracks",
+        params={"market": market},
     )
-    if response.status_code != 200:
-        raise HTTPException(status_code=502, detail="Failed to fetch top tracks")
-    return response.json()
 
 
 @router.get("/artist/{id}/albums")
-def get_artist_albums(id: str, include_groups: str = "album,single"):
+async def get_artist_albums(id: str, include_groups: str = "album,single"):
     """Get artist's albums."""
-    token = get_spotify_access_token()
-    response = requests.get(
-        f"https://api.spotify.com/v1/artists/{id}/albums",
-        headers={"Authorization": f"Bearer {token}"},
+    return await _get_or_502(
+        f"/v1/artists/{id}/albums",
+        "Failed to fetch albums",
         params={"include_groups": include_groups},
     )
-    if response.status_code != 200:
-        raise HTTPException(status_code=502, detail="Failed to fetch albums")
-    return response.json()
 
 
 @router.get("/album/{id}")
-def get_album(id: str):
+async def get_album(id: str):
     """Get Spotify album info."""
-    token = get_spotify_access_token()
-    response = requests.get(
-        f"https://api.spotify.com/v1/albums/{id}",
-        headers={"Authorization": f"Bearer {token}"},
+    return await metadata_cache.get(
+        "album",
+        id,
+        lambda: _get_or_502(f"/v1/albums/{id}", "Failed to fetch album info"),
     )
-    if response.status_code != 200:
-        raise HTTPException(status_code=502, detail="Failed to fetch album info")
-    return response.json()
 
 
 @router.get("/tracks")
-def get_tracks(ids: List[str] = Query(..., description="List of Spotify tracks IDs")):
+async def get_tracks(
+    ids: List[str] = Query(..., description="List of Spotify tracks IDs"),
+):
     """Get multiple tracks by IDs."""
     try:
-        tracks = get_tracks_by_ids(ids)
+        tracks = await get_tracks_by_ids(_split_ids(ids))
         return {"tracks": tracks}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/artists")
-def get_artists(ids: List[str] = Query(..., description="List of Spotify artists IDs")):
+async def get_artists(
+    ids: List[str] = Query(..., description="List of Spotify artists IDs"),
+):
     """Get multiple artists by IDs."""
     try:
-        artists = get_artists_by_ids(ids)
+        artists = await get_artists_by_ids(_split_ids(ids))
         return {"artists": artists}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/albums")
-def get_albums(ids: List[str] = Query(..., description="List of Spotify album IDs")):
+async def get_albums(
+    ids: List[str] = Query(..., description="List of Spotify album IDs"),
+):
     try:
-        albums = get_albums_by_ids(ids)
+        albums = await get_albums_by_ids(_split_ids(ids))
         return {"albums": albums}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/search")
-def search(query: str = Query(..., min_length=1)):
-    token = get_spotify_access_token()
-    try:
-        response = requests.get(
-            "https://api.spotify.com/v1/search",
-            headers={"Authorization": f"Bearer {token}"},
-            params={"q": query, "type": "track,artist,album", "limit": 30},
-            timeout=5,
-        )
-        response.raise_for_status()
-    except requests.RequestException:
-        raise HTTPException(status_code=502, detail="Spotify search failed")
-
-    return response.json()
+async def search(query: str = Query(..., min_length=1)):
+    return await _get_or_502(
+        "/v1/search",
+        "Spotify search failed",
+        params={"q": query, "type": "track,artist,album", "limit": 30},
+    )
 
 
 @router.get("/entities")
-def get_spotify_entities(
+async def get_spotify_entities(
     names: List[str] = Query(..., description="List of names to search"),
     type_: str = Query(..., description="Entity type: track, artist, or album"),
 ):
-    print("8")
-    return search_spotify_entities(names, type_)
+    return await search_spotify_entities(names, type_)
+
+
+@router.get("/entities/by-ids")
+async def get_spotify_entities_by_ids(
+    ids: List[str] = Query(..., description="List of Spotify IDs"),
+    type_: str = Query(..., description="Entity type: track, artist, or album"),
+):
+    """Get summarized entities (name, id, type, image, url) by IDs."""
+    try:
+        return await summarize_entities_by_ids(_split_ids(ids), type_)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except httpx.HTTPError:
+        raise HTTPException(status_code=502, detail="Failed to fetch entities")
+
+
+@router.get("/stats")
+async def get_spotify_stats():
+    """Get Spotify client cache counters."""
+    return {
+        "token": token_manager.stats(),
+        "metadata": metadata_cache.stats(),
+        "search": search_cache.stats(),
+    }
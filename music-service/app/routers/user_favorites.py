@@ -1,13 +1,23 @@
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.schemas.favorite import FavoriteRead
+from app.schemas.favorite import (
+    FavoriteBulk,
+    FavoriteCheck,
+    FavoriteItemResult,
+    FavoriteRead,
+)
 from app.crud.favorite import (
     create_favorite,
     get_favorite,
     erase_favorite,
-    get_all_user_favorites,
+    get_user_favorites_page,
+    count_user_favorites,
+    FAVORITES_PAGE_SIZE,
     get_spotify_metadata_for_user_favorites,
+    create_favorites_bulk,
+    erase_favorites_bulk,
+    get_favorited_ids,
 )
 from app.core.db import get_db
 from app.core.auth import get_current_user
@@ -28,32 +38,120 @@ async def add_favorite(
 ):
     """Add a favorite item."""
     result = await create_favorite(current_user.id, spotify_id, db, type)
-    return {"result": result is not None}
+    return {"result": result}
 
 
 @router.get("/", response_model=list[FavoriteRead])
 async def read_all_user_favorites(
+    response: Response,
+    limit: int = Query(FAVORITES_PAGE_SIZE, ge=1, le=200),
+    cursor: Optional[str] = None,
+    type: Optional[str] = Query(None, description=favorite_type_description),
+    order: Literal["asc", "desc"] = Query("desc", description="By date added"),
+    include_total: bool = False,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Get all user favorites."""
-    result = await get_all_user_favorites(current_user.id, db)
-    if not result:
+    """Get a page of user favorites.
+
+    The next page's cursor is returned in the X-Next-Cursor header and,
+    with include_total, the total count in X-Total-Count.
+    """
+    try:
+        result, next_cursor = await get_user_favorites_page(
+            current_user.id,
+            db,
+            limit=limit,
+            cursor=cursor,
+            type=type,
+            ascending=order == "asc",
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not result and cursor is None:
         raise HTTPException(status_code=404, detail="Favorites not found")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if include_total:
+        total = await count_user_favorites(current_user.id, db, type)
+        response.headers["X-Total-Count"] = str(total)
     return result
 
 
 @router.get("/spotify")
 async def get_all_spotify_metadata_for_user_favorites(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = None,
+    type: Optional[str] = Query(None, description=favorite_type_description),
+    summary: bool = Query(False, description="Only name, image and url"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Get Spotify metadata for all favorites."""
+    """Get Spotify metadata for favorites.
+
+    All favorites are returned unless a limit is given; the next page's
+    cursor is then returned in the X-Next-Cursor header.
+    """
     try:
-        metadata = await get_spotify_metadata_for_user_favorites(current_user.id, db)
-        return metadata
+        metadata, next_cursor = await get_spotify_metadata_for_user_favorites(
+            current_user.id,
+            db,
+            limit=limit,
+            cursor=cursor,
+            type=type,
+            summary=summary,
+        )
+    except HTTPException:
+        raise
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return metadata
+
+
+@router.post("/bulk", response_model=list[FavoriteItemResult])
+async def add_favorites_bulk(
+    request: FavoriteBulk,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Add many favorites; each result is False if it already existed."""
+    results = await create_favorites_bulk(current_user.id, request.items, db)
+    return [
+        {**item.model_dump(), "result": result}
+        for item, result in zip(request.items, results)
+    ]
+
+
+@router.delete("/bulk", response_model=list[FavoriteItemResult])
+async def delete_favorites_bulk(
+    request: FavoriteBulk,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Delete many favorites; each result is False if it was not found."""
+    results = await erase_favorites_bulk(current_user.id, request.items, db)
+    return [
+        {**item.model_dump(), "result": result}
+        for item, result in zip(request.items, results)
+    ]
+
+
+@router.post("/check", response_model=dict[str, bool])
+async def check_favorites(
+    request: FavoriteCheck,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Check which of the given items are favorited, in one query."""
+    favorited = await get_favorited_ids(
+        current_user.id, request.spotify_ids, db, request.type
+    )
+    return {spotify_id: spotify_id in favorited for spotify_id in request.spotify_ids}
 
 
 @router.get("/{spotify_id}", response_model=dict)
@@ -68,7 +166,7 @@ async def read_favorite(
         raise HTTPException(status_code=400, detail="Invalid favorite type")
 
     result = await get_favorite(current_user.id, spotify_id, db, type)
-    return {"result": result is not None}
+    return {"result": result}
 
 
 @router.delete("/{spotify_id}", status_code=200)
@@ -80,4 +178,4 @@ async def delete_favorite(
 ):
     """Delete a favorite item."""
     result = await erase_favorite(current_user.id, spotify_id, db, type)
-    return {"result": result is not None}
+    return {"result": result}
@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+# Deezer schemas
+
+
+class DeezerPreviewItem(BaseModel):
+    """Track to resolve a preview for."""
+
+    track: str
+    artist: str
+    id: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        """Key of this item in the batch response."""
+        return self.id or f"{self.track} - {self.artist}"
+
+
+class DeezerPreviewBatch(BaseModel):
+    """Batch preview request schema."""
+
+    items: List[DeezerPreviewItem] = Field(..., min_length=1, max_length=100)
@@ -1,4 +1,5 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
 from app.models.favorite import FavoriteType
 
 # Favorite schemas
@@ -23,3 +24,29 @@ class FavoriteRead(FavoriteBase):
 
     id: int
     model_config = ConfigDict(from_attributes=True)
+
+
+class FavoriteItem(BaseModel):
+    """Favorite reference schema."""
+
+    spotify_id: str = Field(..., min_length=1, max_length=50)
+    type: FavoriteType
+
+
+class FavoriteBulk(BaseModel):
+    """Bulk favorites request schema."""
+
+    items: List[FavoriteItem] = Field(..., min_length=1, max_length=500)
+
+
+class FavoriteItemResult(FavoriteItem):
+    """Per-item outcome of a bulk favorites request."""
+
+    result: bool
+
+
+class FavoriteCheck(BaseModel):
+    """Batch favorite check request schema."""
+
+    spotify_ids: List[str] = Field(..., min_length=1, max_length=500)
+    type: Optional[FavoriteType] = None
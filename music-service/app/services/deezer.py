@@ -1,11 +1,46 @@
-import requests
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, List, Tuple
+from app.core.cache import MISSING, SingleFlight, TTLCache
+from app.core.http import get_http_client
+from app.services import deezer_genres
+
+# Deezer search cache; "no result" answers are cached for a shorter TTL
+DEEZER_SEARCH_CACHE_TTL = int(os.getenv("DEEZER_SEARCH_CACHE_TTL", "86400"))
+DEEZER_NEGATIVE_CACHE_TTL = int(os.getenv("DEEZER_NEGATIVE_CACHE_TTL", "3600"))
+search_cache = TTLCache(
+    maxsize=int(os.getenv("DEEZER_SEARCH_CACHE_MAXSIZE", "10000")),
+    ttl=DEEZER_SEARCH_CACHE_TTL,
+)
+_search_flight = SingleFlight()
+DEEZER_BATCH_CONCURRENCY = int(os.getenv("DEEZER_BATCH_CONCURRENCY", "8"))
+
+
+def normalize_query(*parts: str) -> str:
+    """Fold case and whitespace so equivalent searches share a cache key."""
+    return " ".join(" ".join(parts).split()).casefold()
+
+
+async def _cached_search(kind: str, query: str, fetch: Callable[[str], Awaitable[Any]]):
+    """Serve a Deezer lookup from the cache, coalescing concurrent misses."""
+    key = (kind, query)
+    cached = search_cache.get(key, MISSING)
+    if cached is not MISSING:
+        return cached
+
+    async def fetch_and_store():
+        result = await fetch(query)
+        ttl = DEEZER_SEARCH_CACHE_TTL if result else DEEZER_NEGATIVE_CACHE_TTL
+        search_cache.set(key, result, ttl=ttl)
+        return result
+
+    return await _search_flight.do(key, fetch_and_store)
 
 
 # Deezer API endpoints
-def fetch_deezer_genres(album: str, artist: str):
-    """Get Deezer genre for album and artist."""
-    query = f"{album} {artist}"
-    response = requests.get("https://api.deezer.com/search/album", params={"q": query})
+async def _search_album_genre(query: str):
+    client = get_http_client("deezer")
+    response = await client.get("/search/album", params={"q": query})
     response.raise_for_status()
     data = response.json()
 
@@ -16,17 +51,22 @@ def fetch_deezer_genres(album: str, artist: str):
     if not genre_id:
         return None
 
-    genre_response = requests.get(f"https://api.deezer.com/genre/{genre_id}")
+    genre_name = deezer_genres.lookup_genre_name(genre_id)
+    if genre_name:
+        return genre_name
+
+    # Genre not in the startup table yet, fall back to a direct lookup
+    genre_response = await client.get(f"/genre/{genre_id}")
     genre_response.raise_for_status()
-    genre_data = genre_response.json()
+    genre_name = genre_response.json().get("name")
+    if genre_name:
+        deezer_genres.remember_genre(genre_id, genre_name)
 
-    return genre_data.get("name")
+    return genre_name
 
 
-def fetch_deezer_preview_url(track_name, artist_name):
-    """Get Deezer preview URL for track."""
-    query = f"{track_name} {artist_name}"
-    response = requests.get("https://api.deezer.com/search/track", params={"q": query})
+async def _search_track_preview(query: str):
+    response = await get_http_client("deezer").get("/search/track", params={"q": query})
     response.raise_for_status()
     data = response.json()
 
@@ -34,3 +74,43 @@ def fetch_deezer_preview_url(track_name, artist_name):
         return None
 
     return data["data"][0].get("preview")
+
+
+async def fetch_deezer_genres(album: str, artist: str):
+    """Get Deezer genre for album and artist."""
+    return await _cached_search(
+        "genre", normalize_query(album, artist), _search_album_genre
+    )
+
+
+async def fetch_deezer_preview_url(track_name, artist_name):
+    """Get Deezer preview URL for track."""
+    return await _cached_search(
+        "preview", normalize_query(track_name, artist_name), _search_track_preview
+    )
+
+
+async def fetch_deezer_preview_urls(pairs: List[Tuple[str, str, str]]):
+    """Resolve (key, track, artist) previews concurrently.
+
+    Returns a ``{key: preview_url}`` map and a ``{key: error}`` map for the
+    items whose lookup failed, so one bad item does not fail the batch.
+    """
+    semaphore = asyncio.Semaphore(DEEZER_BATCH_CONCURRENCY)
+    previews = {}
+    errors = {}
+
+    async def resolve(key: str, track_name: str, artist_name: str):
+        try:
+            async with semaphore:
+                previews[key] = await fetch_deezer_preview_url(track_name, artist_name)
+        except Exception as e:
+            errors[key] = str(e) or type(e).__name__
+
+    await asyncio.gather(*(resolve(*pair) for pair in pairs))
+    return previews, errors
+
+
+def search_cache_stats() -> dict:
+    """Return Deezer search cache counters."""
+    return {**search_cache.stats(), "requests": _search_flight.stats()}
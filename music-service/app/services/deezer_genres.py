@@ -1,18 +1,79 @@
-import requests
+import asyncio
+import json
+import os
+from pathlib import Path
+import httpx
+from app.core.http import get_http_client
 
 # Global genre map
 DEEZER_GENRE_MAP = {}
 
+# On-disk copy of the genre table, so startup does not depend on Deezer
+GENRES_SNAPSHOT_PATH = Path(
+    os.getenv(
+        "DEEZER_GENRES_SNAPSHOT",
+        Path(__file__).resolve().parent.parent / "data" / "deezer_genres.json",
+    )
+)
+GENRES_REFRESH_INTERVAL = int(os.getenv("DEEZER_GENRES_REFRESH_INTERVAL", "86400"))
+GENRES_RETRY_INTERVAL = 300
 
-def load_deezer_genres():
-    """Load Deezer genres into global map."""
+
+def load_genres_snapshot() -> bool:
+    """Load the genre map from the on-disk snapshot."""
     global DEEZER_GENRE_MAP
-    response = requests.get("https://api.deezer.com/genre")
-    if response.status_code == 200:
+    try:
+        data = json.loads(GENRES_SNAPSHOT_PATH.read_text())
+    except (OSError, ValueError):
+        return False
+    DEEZER_GENRE_MAP = {int(genre_id): name for genre_id, name in data.items()}
+    return bool(DEEZER_GENRE_MAP)
+
+
+def save_genres_snapshot():
+    """Persist the current genre map to disk."""
+    try:
+        GENRES_SNAPSHOT_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = GENRES_SNAPSHOT_PATH.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(DEEZER_GENRE_MAP))
+        os.replace(tmp_path, GENRES_SNAPSHOT_PATH)
+    except OSError as e:
+        print(f"[Deezer] Failed to save genre snapshot: {e}")
+
+
+async def load_deezer_genres() -> bool:
+    """Load Deezer genres into global map, keeping the old map on failure."""
+    global DEEZER_GENRE_MAP
+    try:
+        response = await get_http_client("deezer").get("/genre")
+        if response.status_code != 200:
+            return False
         data = response.json()
-        DEEZER_GENRE_MAP = {genre["id"]: genre["name"] for genre in data["data"]}
-    else:
-        DEEZER_GENRE_MAP = {}
+        genre_map = {genre["id"]: genre["name"] for genre in data["data"]}
+    except (httpx.HTTPError, ValueError, KeyError, TypeError) as e:
+        print(f"[Deezer] Failed to load genres: {e!r}")
+        return False
+
+    DEEZER_GENRE_MAP = genre_map
+    save_genres_snapshot()
+    return True
+
+
+async def refresh_deezer_genres(interval: int = GENRES_REFRESH_INTERVAL):
+    """Refresh the genre map now and then every ``interval`` seconds."""
+    while True:
+        loaded = await load_deezer_genres()
+        await asyncio.sleep(interval if loaded else GENRES_RETRY_INTERVAL)
+
+
+def lookup_genre_name(genre_id: int) -> str | None:
+    """Get genre name by ID, or None if it is not in the map."""
+    return DEEZER_GENRE_MAP.get(genre_id)
+
+
+def remember_genre(genre_id: int, name: str):
+    """Add a genre resolved outside the bulk load to the map."""
+    DEEZER_GENRE_MAP[genre_id] = name
 
 
 def get_genre_name_by_id(genre_id: int) -> str:
@@ -0,0 +1,193 @@
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from app.core.cache import TTLCache
+from app.core.db import AsyncSessionLocal
+from app.models.spotify_metadata import SpotifyMetadata
+
+# Read-through cache for Spotify track, artist and album JSON
+
+METADATA_CACHE_BACKEND = os.getenv("SPOTIFY_METADATA_CACHE_BACKEND", "memory")
+METADATA_CACHE_TTL = int(os.getenv("SPOTIFY_METADATA_CACHE_TTL", "86400"))
+METADATA_CACHE_MAXSIZE = int(os.getenv("SPOTIFY_METADATA_CACHE_MAXSIZE", "10000"))
+METADATA_CACHE_PRUNE_EVERY = 500
+
+
+class MemoryMetadataBackend:
+    """In-process LRU tier, private to one worker."""
+
+    name = "memory"
+
+    def __init__(
+        self, maxsize: int = METADATA_CACHE_MAXSIZE, ttl: int = METADATA_CACHE_TTL
+    ):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get_many(self, entity_type: str, ids: List[str]) -> Dict[str, Any]:
+        found = {}
+        for spotify_id in ids:
+            data = self.cache.get((entity_type, spotify_id))
+            if data is not None:
+                found[spotify_id] = data
+        return found
+
+    async def set_many(self, entity_type: str, items: Dict[str, Any]):
+        for spotify_id, data in items.items():
+            self.cache.set((entity_type, spotify_id), data)
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+
+class PostgresMetadataBackend:
+    """Postgres tier shared by all workers, backed by ``spotify_metadata``."""
+
+    name = "postgres"
+
+    def __init__(self, ttl: int = METADATA_CACHE_TTL):
+        self.ttl = timedelta(seconds=ttl)
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._writes = 0
+
+    async def get_many(self, entity_type: str, ids: List[str]) -> Dict[str, Any]:
+        cutoff = datetime.now(timezone.utc) - self.ttl
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(SpotifyMetadata.spotify_id, SpotifyMetadata.data).where(
+                        SpotifyMetadata.entity_type == entity_type,
+                        SpotifyMetadata.spotify_id.in_(ids),
+                        SpotifyMetadata.fetched_at > cutoff,
+                    )
+                )
+                found = {row.spotify_id: row.data for row in result}
+        except Exception as e:
+            # A broken shared tier degrades to upstream fetches
+            self.errors += 1
+            print(f"[Metadata Cache] Postgres read failed: {e}")
+            return {}
+
+        self.hits += len(found)
+        self.misses += len(ids) - len(found)
+        return found
+
+    async def set_many(self, entity_type: str, items: Dict[str, Any]):
+        if not items:
+            return
+        now = datetime.now(timezone.utc)
+        stmt = insert(SpotifyMetadata).values(
+            [
+                {
+                    "entity_type": entity_type,
+                    "spotify_id": spotify_id,
+                    "data": data,
+                    "fetched_at": now,
+                }
+                for spotify_id, data in items.items()
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SpotifyMetadata.entity_type, SpotifyMetadata.spotify_id],
+            set_={"data": stmt.excluded.data, "fetched_at": stmt.excluded.fetched_at},
+        )
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(stmt)
+                self._writes += len(items)
+                if self._writes >= METADATA_CACHE_PRUNE_EVERY:
+                    self._writes = 0
+                    await session.execute(
+                        delete(SpotifyMetadata).where(
+                            SpotifyMetadata.fetched_at <= now - self.ttl
+                        )
+                    )
+                await session.commit()
+        except Exception as e:
+            self.errors += 1
+            print(f"[Metadata Cache] Postgres write failed: {e}")
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+
+class MetadataCache:
+    """Read-through cache keyed by (entity type, Spotify id).
+
+    Lookups walk the tiers in order and backfill faster tiers on a hit in a
+    slower one; only ids missing from every tier are fetched upstream.
+    """
+
+    def __init__(self, backends: list):
+        self.backends = backends
+        self.upstream_fetches = 0
+
+    async def get_many(
+        self,
+        entity_type: str,
+        ids: List[str],
+        fetch_missing: Callable[[List[str]], Awaitable[List[Any]]],
+    ) -> List[Any]:
+        """Get entities in input order, fetching only the cache misses."""
+        found: Dict[str, Any] = {}
+        missing = list(dict.fromkeys(ids))
+
+        for i, backend in enumerate(self.backends):
+            if not missing:
+                break
+            hits = await backend.get_many(entity_type, missing)
+            if hits:
+                for faster in self.backends[:i]:
+                    await faster.set_many(entity_type, hits)
+                found.update(hits)
+                missing = [
+                    spotify_id for spotify_id in missing if spotify_id not in hits
+                ]
+
+        if missing:
+            self.upstream_fetches += 1
+            fetched = await fetch_missing(missing)
+            # Spotify returns null in place of unknown ids; those are not cached
+            fresh = {
+                spotify_id: item
+                for spotify_id, item in zip(missing, fetched)
+                if item is not None
+            }
+            for backend in self.backends:
+                await backend.set_many(entity_type, fresh)
+            found.update(fresh)
+
+        return [found.get(spotify_id) for spotify_id in ids]
+
+    async def get(
+        self,
+        entity_type: str,
+        spotify_id: str,
+        fetch_one: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Get a single entity, fetching it on a miss."""
+
+        async def fetch_missing(_ids: List[str]):
+            return [await fetch_one()]
+
+        results = await self.get_many(entity_type, [spotify_id], fetch_missing)
+        return results[0]
+
+    def stats(self) -> dict:
+        return {
+            "upstream_fetches": self.upstream_fetches,
+            **{backend.name: backend.stats() for backend in self.backends},
+        }
+
+
+def _build_backends() -> list:
+    backends = [MemoryMetadataBackend()]
+    if METADATA_CACHE_BACKEND == "postgres":
+        backends.append(PostgresMetadataBackend())
+    return backends
+
+
+metadata_cache = MetadataCache(_build_backends())
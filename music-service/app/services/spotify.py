@@ -1,95 +1,86 @@
-import requests
-import os
-from fastapi import HTTPException
+import httpx
 from typing import List
+from app.core.http import get_http_client
+from app.services.spotify_token import token_manager
+from app.services.metadata_cache import metadata_cache
 
 # Spotify API endpoints
-SPOTIFY_TOKEN_URL = "https://accounts.spotify.com/api/token"
-SPOTIFY_TRACKS_URL = "https://api.spotify.com/v1/tracks"
-SPOTIFY_ARTISTS_URL = "https://api.spotify.com/v1/artists"
-SPOTIFY_ALBUMS_URL = "https://api.spotify.com/v1/albums"
+SPOTIFY_TRACKS_URL = "/v1/tracks"
+SPOTIFY_ARTISTS_URL = "/v1/artists"
+SPOTIFY_ALBUMS_URL = "/v1/albums"
 
+# Maximum IDs accepted by the Spotify "get several" endpoints
+MAX_TRACKS_PER_REQUEST = 50
+MAX_ARTISTS_PER_REQUEST = 50
+MAX_ALBUMS_PER_REQUEST = 20
 
-def get_spotify_access_token():
-    """Get Spotify API access token."""
-    client_id = os.getenv("SPOTIFY_CLIENT_ID")
-    client_secret = os.getenv("SPOTIFY_CLIENT_SECRET")
 
-    if not client_id or not client_secret:
-        raise HTTPException(status_code=500, detail="Missing Spotify credentials")
+async def get_spotify_access_token():
+    """Get Spotify API access token from the shared token cache."""
+    return await token_manager.get_token()
 
-    response = requests.post(
-        SPOTIFY_TOKEN_URL,
-        data={"grant_type": "client_credentials"},
-        auth=(client_id, client_secret),
-    )
-
-    if response.status_code != 200:
-        raise HTTPException(
-            status_code=500, detail="Failed to authenticate with Spotify"
-        )
-
-    return response.json()["access_token"]
 
+async def spotify_get(path: str, params: dict | None = None) -> httpx.Response:
+    """Send an authenticated GET request to the Spotify Web API."""
+    token = await get_spotify_access_token()
+    return await get_http_client("spotify").get(
+        path,
+        headers={"Authorization": f"Bearer {token}"},
+        params=params,
+    )
 
-def get_tracks_by_ids(ids: List[str]):
-    """Get Spotify tracks by IDs."""
-    token = get_spotify_access_token()
-    if len(ids) > 10:
-        raise ValueError("Can fetch a maximum of 10 tracks per request")
 
-    headers = {"Authorization": f"Bearer {token}"}
-    params = {"ids": ",".join(ids)}
-    response = requests.get(SPOTIFY_TRACKS_URL, headers=headers, params=params)
+async def _get_several(url: str, key: str, ids: List[str]):
+    """Get several Spotify entities of one type in a single request."""
+    response = await spotify_get(url, params={"ids": ",".join(ids)})
 
     try:
         response.raise_for_status()
-    except requests.HTTPError as e:
-        raise requests.HTTPError(
-            f"Spotify API error: {response.status_code} - {response.text}"
+    except httpx.HTTPStatusError as e:
+        raise httpx.HTTPStatusError(
+            f"Spotify API error: {response.status_code} - {response.text}",
+            request=e.request,
+            response=e.response,
         ) from e
 
     data = response.json()
-    return data.get("tracks", [])
-
+    return data.get(key, [])
 
-def get_artists_by_ids(ids: List[str]):
-    """Get Spotify artists by IDs."""
-    token = get_spotify_access_token()
-    if len(ids) > 10:
-        raise ValueError("Can fetch a maximum of 10 artists per request")
 
-    headers = {"Authorization": f"Bearer {token}"}
-    params = {"ids": ",".join(ids)}
-    response = requests.get(SPOTIFY_ARTISTS_URL, headers=headers, params=params)
+async def get_tracks_by_ids(ids: List[str]):
+    """Get Spotify tracks by IDs."""
+    if len(ids) > MAX_TRACKS_PER_REQUEST:
+        raise ValueError(
+            f"Can fetch a maximum of {MAX_TRACKS_PER_REQUEST} tracks per request"
+        )
+    return await metadata_cache.get_many(
+        "track",
+        ids,
+        lambda missing: _get_several(SPOTIFY_TRACKS_URL, "tracks", missing),
+    )
 
-    try:
-        response.raise_for_status()
-    except requests.HTTPError as e:
-        raise requests.HTTPError(
-            f"Spotify API error: {response.status_code} - {response.text}"
-        ) from e
 
-    data = response.json()
-    return data.get("artists", [])
+async def get_artists_by_ids(ids: List[str]):
+    """Get Spotify artists by IDs."""
+    if len(ids) > MAX_ARTISTS_PER_REQUEST:
+        raise ValueError(
+            f"Can fetch a maximum of {MAX_ARTISTS_PER_REQUEST} artists per request"
+        )
+    return await metadata_cache.get_many(
+        "artist",
+        ids,
+        lambda missing: _get_several(SPOTIFY_ARTISTS_URL, "artists", missing),
+    )
 
 
-def get_albums_by_ids(ids: List[str]):
+async def get_albums_by_ids(ids: List[str]):
     """Get Spotify albums by IDs."""
-    token = get_spotify_access_token()
-    if len(ids) > 10:
-        raise ValueError("Can fetch a maximum of 10 albums per request")
-
-    headers = {"Authorization": f"Bearer {token}"}
-    params = {"ids": ",".join(ids)}
-    response = requests.get(SPOTIFY_ALBUMS_URL, headers=headers, params=params)
-
-    try:
-        response.raise_for_status()
-    except requests.HTTPError as e:
-        raise requests.HTTPError(
-            f"Spotify API error: {response.status_code} - {response.text}"
-        ) from e
-
-    data = response.json()
-    return data.get("albums", [])
+    if len(ids) > MAX_ALBUMS_PER_REQUEST:
+        raise ValueError(
+            f"Can fetch a maximum of {MAX_ALBUMS_PER_REQUEST} albums per request"
+        )
+    return await metadata_cache.get_many(
+        "album",
+        ids,
+        lambda missing: _get_several(SPOTIFY_ALBUMS_URL, "albums", missing),
+    )
@@ -1,38 +1,109 @@
+import asyncio
 import os
-from spotipy import Spotify
-from spotipy.oauth2 import SpotifyClientCredentials
 from typing import List
+from app.core.cache import MISSING, TTLCache
+from app.services.spotify import (
+    get_albums_by_ids,
+    get_artists_by_ids,
+    get_tracks_by_ids,
+    spotify_get,
+    MAX_ALBUMS_PER_REQUEST,
+    MAX_ARTISTS_PER_REQUEST,
+    MAX_TRACKS_PER_REQUEST,
+)
 
-# Initialize Spotify client
-client_id = os.getenv("SPOTIFY_CLIENT_ID")
-client_secret = os.getenv("SPOTIFY_CLIENT_SECRET")
-sp = Spotify(auth_manager=SpotifyClientCredentials(client_id, client_secret))
+# Concurrent name -> entity resolution
+SEARCH_CONCURRENCY = int(os.getenv("SPOTIFY_SEARCH_CONCURRENCY", "8"))
+SEARCH_TIMEOUT = float(os.getenv("SPOTIFY_SEARCH_TIMEOUT", "5"))
+SEARCH_CACHE_TTL = int(os.getenv("SPOTIFY_SEARCH_CACHE_TTL", "86400"))
+SEARCH_NEGATIVE_CACHE_TTL = int(os.getenv("SPOTIFY_SEARCH_NEGATIVE_CACHE_TTL", "3600"))
 
+# Type -> (batch lookup through the metadata cache, ids per lookup)
+BY_IDS = {
+    "track": (get_tracks_by_ids, MAX_TRACKS_PER_REQUEST),
+    "artist": (get_artists_by_ids, MAX_ARTISTS_PER_REQUEST),
+    "album": (get_albums_by_ids, MAX_ALBUMS_PER_REQUEST),
+}
 
-def search_spotify_entities(names: List[str], type_: str):
-    """Search Spotify for entities by name and type."""
-    results = []
+# (normalized name, type) -> summarized entity, or None when nothing matched
+search_cache = TTLCache(
+    maxsize=int(os.getenv("SPOTIFY_SEARCH_CACHE_MAXSIZE", "5000")),
+    ttl=SEARCH_CACHE_TTL,
+)
 
-    for name in names:
-        try:
-            query = f"{name}"
-            search = sp.search(q=query, type=type_, limit=1)
-            items = search.get(f"{type_}s", {}).get("items", [])
-            if not items:
-                continue
-            item = items[0]
-            result = {
-                "name": item.get("name"),
-                "id": item.get("id"),
-                "type": type_,
-                "image": item.get("images", [{}])[0].get("url")
-                if type_ != "track"
-                else item["album"]["images"][0]["url"],
-                "url": item.get("external_urls", {}).get("spotify"),
-            }
-            results.append(result)
 
+def _cache_key(name: str, type_: str) -> tuple:
+    return (" ".join(name.split()).casefold(), type_)
+
+
+def _first_image(images) -> str | None:
+    return images[0].get("url") if images else None
+
+
+def summarize_entity(item: dict, type_: str) -> dict:
+    """Reduce a Spotify object to the fields the UI renders."""
+    if type_ == "track":
+        image = _first_image(item.get("album", {}).get("images"))
+    else:
+        image = _first_image(item.get("images"))
+    return {
+        "name": item.get("name"),
+        "id": item.get("id"),
+        "type": type_,
+        "image": image,
+        "url": item.get("external_urls", {}).get("spotify"),
+    }
+
+
+async def _search_one(name: str, type_: str) -> dict | None:
+    """Search Spotify for the best match of one name."""
+    response = await spotify_get(
+        "/v1/search", params={"q": name, "type": type_, "limit": 1}
+    )
+    response.raise_for_status()
+    items = response.json().get(f"{type_}s", {}).get("items", [])
+    if not items:
+        return None
+    return summarize_entity(items[0], type_)
+
+
+async def search_spotify_entities(names: List[str], type_: str):
+    """Search Spotify for entities by name and type, keeping input order."""
+    semaphore = asyncio.Semaphore(SEARCH_CONCURRENCY)
+
+    async def resolve(name: str):
+        key = _cache_key(name, type_)
+        cached = search_cache.get(key, MISSING)
+        if cached is not MISSING:
+            return cached
+
+        try:
+            async with semaphore:
+                result = await asyncio.wait_for(
+                    _search_one(name, type_), timeout=SEARCH_TIMEOUT
+                )
         except Exception:
-            continue
+            # Timeouts and upstream errors drop the name without caching it
+            return None
+
+        ttl = SEARCH_CACHE_TTL if result else SEARCH_NEGATIVE_CACHE_TTL
+        search_cache.set(key, result, ttl=ttl)
+        return result
+
+    results = await asyncio.gather(*(resolve(name) for name in names))
+    return [result for result in results if result]
+
+
+async def summarize_entities_by_ids(ids: List[str], type_: str):
+    """Summarize Spotify entities by id, keeping input order.
 
-    return results
+    Ids are looked up through the metadata cache in chunks of the
+    per-type batch limit; unknown ids are skipped.
+    """
+    if type_ not in BY_IDS:
+        raise ValueError(f"Invalid entity type: {type_!r}")
+    fetch, batch_size = BY_IDS[type_]
+    chunks = await asyncio.gather(
+        *(fetch(ids[i : i + batch_size]) for i in range(0, len(ids), batch_size))
+    )
+    return [summarize_entity(item, type_) for chunk in chunks for item in chunk if item]
@@ -0,0 +1,120 @@
+import asyncio
+import os
+import time
+import httpx
+from fastapi import HTTPException
+from app.core.http import get_http_client
+
+# Spotify client-credentials token cache
+SPOTIFY_TOKEN_PATH = "/api/token"
+TOKEN_REFRESH_MARGIN = int(os.getenv("SPOTIFY_TOKEN_REFRESH_MARGIN", "60"))
+
+
+class SpotifyTokenManager:
+    """Process-wide cache for the Spotify client-credentials token.
+
+    The token is served from memory until ``refresh_margin`` seconds before it
+    expires. Inside that window the current token is still returned while a
+    single background refresh fetches the next one; once it has expired,
+    callers wait on one shared refresh instead of each requesting a token.
+    """
+
+    def __init__(self, refresh_margin: int = TOKEN_REFRESH_MARGIN):
+        self.refresh_margin = refresh_margin
+        self._token = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self._background_task = None
+        self.hits = 0
+        self.refreshes = 0
+        self.failures = 0
+
+    async def get_token(self) -> str:
+        """Return a valid access token, refreshing it if needed."""
+        now = time.monotonic()
+        if self._token and now < self._expires_at - self.refresh_margin:
+            self.hits += 1
+            return self._token
+
+        if self._token and now < self._expires_at:
+            self.hits += 1
+            self._refresh_in_background()
+            return self._token
+
+        async with self._lock:
+            # Another caller may have refreshed while we waited for the lock
+            if self._token and time.monotonic() < self._expires_at:
+                self.hits += 1
+                return self._token
+            await self._refresh()
+            return self._token
+
+    def stats(self) -> dict:
+        """Return token cache counters."""
+        return {
+            "hits": self.hits,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "expires_in": max(0, int(self._expires_at - time.monotonic())),
+        }
+
+    def reset(self):
+        """Drop the cached token and counters."""
+        self._token = None
+        self._expires_at = 0.0
+        self.hits = self.refreshes = self.failures = 0
+
+    def _refresh_in_background(self):
+        if self._background_task and not self._background_task.done():
+            return
+        self._background_task = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self):
+        try:
+            async with self._lock:
+                if time.monotonic() < self._expires_at - self.refresh_margin:
+                    return
+                await self._refresh()
+        except HTTPException as e:
+            # The current token is still valid; the next caller retries
+            print(f"[Spotify] Background token refresh failed: {e.detail}")
+
+    async def _refresh(self):
+        """Fetch a new token. Must be called with the lock held."""
+        client_id = os.getenv("SPOTIFY_CLIENT_ID")
+        client_secret = os.getenv("SPOTIFY_CLIENT_SECRET")
+
+        if not client_id or not client_secret:
+            raise HTTPException(status_code=500, detail="Missing Spotify credentials")
+
+        try:
+            response = await get_http_client("spotify_accounts").post(
+                SPOTIFY_TOKEN_PATH,
+                data={"grant_type": "client_credentials"},
+                auth=(client_id, client_secret),
+            )
+        except httpx.HTTPError:
+            response = None
+
+        if response is None or response.status_code != 200:
+            raise self._failure()
+
+        try:
+            data = response.json()
+            token = data["access_token"]
+            expires_in = int(data.get("expires_in", 3600))
+        except (ValueError, KeyError, TypeError):
+            raise self._failure()
+
+        self._token = token
+        self._expires_at = time.monotonic() + expires_in
+        self.refreshes += 1
+
+    def _failure(self) -> HTTPException:
+        self.failures += 1
+        return HTTPException(
+            status_code=500, detail="Failed to authenticate with Spotify"
+        )
+
+
+token_manager = SpotifyTokenManager()
@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sess
 from sqlalchemy.pool import NullPool
 from app.models.user import User
 from app.core.security import hash_password
+from app.core.auth import user_cache
 from httpx import AsyncClient, ASGITransport
 from app.main import app
 from pathlib import Path
@@ -71,6 +72,14 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    """Start every test with an empty authenticated user cache."""
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
 @pytest_asyncio.fixture(scope="function")
 async def db_session():
     """Create database session for test function."""
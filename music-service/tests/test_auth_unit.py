@@ -0,0 +1,62 @@
+import pytest
+from unittest.mock import Mock
+from authlib.jose import jwt
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from app.core import auth
+from app.models.user import User
+
+
+@pytest.fixture(autouse=True)
+def auth_settings(monkeypatch):
+    monkeypatch.setattr(auth, "SECRET_KEY", "test-secret")
+    auth.user_cache.clear()
+    auth.token_version_cache.clear()
+    yield
+    auth.user_cache.clear()
+    auth.token_version_cache.clear()
+
+
+def _credentials(claims):
+    token = jwt.encode({"alg": auth.ALGORITHM}, claims, "test-secret")
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_caches_user(mock_db):
+    """
+    Tests that repeated requests for the same user hit the database once.
+    """
+    user = User(id=1, username="alice", email="a@example.com", hashed_password="h")
+    mock_result = Mock()
+    mock_result.scalar_one_or_none.return_value = user
+    mock_db.execute.return_value = mock_result
+
+    first = await auth.get_current_user(_credentials({"sub": "alice"}), mock_db)
+    second = await auth.get_current_user(_credentials({"sub": "alice"}), mock_db)
+
+    assert first is user
+    assert (second.id, second.username) == (1, "alice")
+    mock_db.execute.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_stateless_mode_trusts_claims_with_cached_version(mock_db, monkeypatch):
+    """
+    Tests that stateless mode only looks up the token version, once per user.
+    """
+    monkeypatch.setattr(auth, "AUTH_STATELESS", True)
+    mock_result = Mock()
+    mock_result.scalar_one_or_none.return_value = 3
+    mock_db.execute.return_value = mock_result
+    claims = {"sub": "alice", "uid": 1, "ver": 3}
+
+    first = await auth.get_current_user(_credentials(claims), mock_db)
+    second = await auth.get_current_user(_credentials(claims), mock_db)
+
+    assert (first.id, second.id) == (1, 1)
+    mock_db.execute.assert_called_once()
+
+    with pytest.raises(HTTPException) as exc:
+        await auth.get_current_user(_credentials({**claims, "ver": 2}), mock_db)
+    assert exc.value.status_code == 401
@@ -0,0 +1,161 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from app.services import deezer, deezer_genres
+from app.services.deezer import (
+    fetch_deezer_genres,
+    fetch_deezer_preview_url,
+    fetch_deezer_preview_urls,
+)
+
+
+def _response(payload):
+    response = Mock()
+    response.status_code = 200
+    response.json.return_value = payload
+    response.raise_for_status = Mock()
+    return response
+
+
+@pytest.fixture(autouse=True)
+def clear_search_cache():
+    deezer.search_cache.clear()
+    yield
+    deezer.search_cache.clear()
+
+
+@pytest.fixture
+def genre_map():
+    original = dict(deezer_genres.DEEZER_GENRE_MAP)
+    deezer_genres.DEEZER_GENRE_MAP = {132: "Pop"}
+    yield deezer_genres.DEEZER_GENRE_MAP
+    deezer_genres.DEEZER_GENRE_MAP = original
+
+
+def test_genre_snapshot_round_trip(tmp_path, genre_map):
+    """
+    Tests that the genre map survives a save/load through the snapshot file.
+    """
+    with patch.object(deezer_genres, "GENRES_SNAPSHOT_PATH", tmp_path / "g.json"):
+        deezer_genres.save_genres_snapshot()
+        deezer_genres.DEEZER_GENRE_MAP = {}
+        assert deezer_genres.load_genres_snapshot() is True
+
+    assert deezer_genres.DEEZER_GENRE_MAP == {132: "Pop"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("payload", [{"error": "quota"}, ValueError("not json")])
+async def test_load_deezer_genres_keeps_map_on_bad_body(genre_map, payload):
+    """
+    Tests that a malformed /genre body keeps the old map instead of raising.
+    """
+    response = _response(None)
+    if isinstance(payload, Exception):
+        response.json.side_effect = payload
+    else:
+        response.json.return_value = payload
+    client = Mock()
+    client.get = AsyncMock(return_value=response)
+
+    with patch.object(deezer_genres, "get_http_client", return_value=client):
+        assert await deezer_genres.load_deezer_genres() is False
+
+    assert deezer_genres.DEEZER_GENRE_MAP == {132: "Pop"}
+
+
+@pytest.mark.asyncio
+async def test_fetch_deezer_genres_uses_genre_map(genre_map):
+    """
+    Tests that a known genre_id is resolved without a /genre request.
+    """
+    client = Mock()
+    client.get = AsyncMock(return_value=_response({"data": [{"genre_id": 132}]}))
+
+    with patch("app.services.deezer.get_http_client", return_value=client):
+        genre = await fetch_deezer_genres("Thriller", "Michael Jackson")
+
+    assert genre == "Pop"
+    client.get.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_fetch_deezer_preview_url_is_cached_by_normalized_query():
+    """
+    Tests that case/whitespace variants of a search share one upstream call.
+    """
+    client = Mock()
+    client.get = AsyncMock(return_value=_response({"data": [{"preview": "p.mp3"}]}))
+
+    with patch("app.services.deezer.get_http_client", return_value=client):
+        first = await fetch_deezer_preview_url("Get Lucky", "Daft Punk")
+        second = await fetch_deezer_preview_url("  get lucky", "DAFT  punk ")
+
+    assert first == second == "p.mp3"
+    client.get.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_fetch_deezer_preview_url_caches_missing_results():
+    """
+    Tests that a search with no result is cached with the negative TTL.
+    """
+    client = Mock()
+    client.get = AsyncMock(return_value=_response({"data": []}))
+
+    with patch("app.services.deezer.get_http_client", return_value=client):
+        assert await fetch_deezer_preview_url("Unknown", "Nobody") is None
+        assert await fetch_deezer_preview_url("Unknown", "Nobody") is None
+
+    client.get.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_searches_are_coalesced():
+    """
+    Tests that concurrent misses for the same query share one upstream call.
+    """
+
+    async def slow_get(*args, **kwargs):
+        await asyncio.sleep(0.02)
+        return _response({"data": [{"preview": "p.mp3"}]})
+
+    client = Mock()
+    client.get = AsyncMock(side_effect=slow_get)
+
+    with patch("app.services.deezer.get_http_client", return_value=client):
+        results = await asyncio.gather(
+            *(fetch_deezer_preview_url("Song", "Artist") for _ in range(10))
+        )
+
+    assert results == ["p.mp3"] * 10
+    client.get.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_fetch_deezer_preview_urls_returns_partial_results():
+    """
+    Tests that a failing item is reported without failing the whole batch.
+    """
+
+    async def get(path, params):
+        if params["q"].startswith("broken"):
+            raise RuntimeError("Deezer unavailable")
+        if params["q"].startswith("missing"):
+            return _response({"data": []})
+        return _response({"data": [{"preview": f"{params['q']}.mp3"}]})
+
+    client = Mock()
+    client.get = AsyncMock(side_effect=get)
+
+    with patch("app.services.deezer.get_http_client", return_value=client):
+        previews, errors = await fetch_deezer_preview_urls(
+            [
+                ("t1", "song", "artist"),
+                ("t2", "missing", "artist"),
+                ("t3", "broken", "artist"),
+            ]
+        )
+
+    assert previews == {"t1": "song artist.mp3", "t2": None}
+    assert errors == {"t3": "Deezer unavailable"}
@@ -1,6 +1,28 @@
 import pytest
 from unittest.mock import AsyncMock, Mock
-from app.crud.favorite import create_favorite, get_all_user_favorites, erase_favorite
+from app.crud.favorite import (
+    create_favorite,
+    get_all_user_favorites,
+    erase_favorite,
+    _fetch_spotify_data_in_batches,
+    create_favorites_bulk,
+    erase_favorites_bulk,
+    get_favorite,
+    get_favorited_ids,
+    get_user_favorites_page,
+    count_user_favorites,
+    favorite_counts,
+    get_spotify_metadata_for_user_favorites,
+)
+import app.crud.favorite as favorite_crud
+from app.main import app
+from app.core.db import get_db
+from app.core.auth import get_current_user
+from httpx import AsyncClient, ASGITransport
+from app.models.favorite import FavoriteType
+from app.schemas.favorite import FavoriteItem
+from types import SimpleNamespace
+from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException
 
 
@@ -11,8 +33,8 @@ async def test_create_favorite_success(mock_db):
     """
     mock_result = Mock()  # Use a standard Mock for the result object
 
-    # Simulate that the item does NOT exist in the database
-    mock_result.scalar_one_or_none.return_value = None
+    # Simulate that the insert returned the new row id
+    mock_result.scalar_one_or_none.return_value = 42
     mock_db.execute.return_value = mock_result
 
     result = await create_favorite(
@@ -23,7 +45,9 @@ async def test_create_favorite_success(mock_db):
     )
 
     assert result is True
+    mock_db.execute.assert_called_once()
     mock_db.commit.assert_called_once()
+    mock_db.refresh.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -33,8 +57,8 @@ async def test_create_favorite_duplicate(mock_db):
     """
     mock_result = Mock()  # Use a standard Mock
 
-    # Simulate that the item DOES exist in the database
-    mock_result.scalar_one_or_none.return_value = object()
+    # Simulate that the insert hit the unique index and returned no row
+    mock_result.scalar_one_or_none.return_value = None
     mock_db.execute.return_value = mock_result
 
     result = await create_favorite(
@@ -53,12 +77,6 @@ async def test_create_favorite_missing_type(mock_db):
     """
     Tests that an HTTPException is raised if the 'type' parameter is missing.
     """
-    mock_result = Mock()  # Use a standard Mock
-
-    # Simulate that the item does NOT exist, so the function proceeds to the type check
-    mock_result.scalar_one_or_none.return_value = None
-    mock_db.execute.return_value = mock_result
-
     with pytest.raises(HTTPException) as exc_info:
         await create_favorite(
             user_id=1,
@@ -69,6 +87,7 @@ async def test_create_favorite_missing_type(mock_db):
 
     assert exc_info.value.status_code == 400
     assert "Favorite type is required" in exc_info.value.detail
+    mock_db.execute.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -76,12 +95,6 @@ async def test_create_favorite_invalid_type(mock_db):
     """
     Tests that an HTTPException is raised for an invalid 'type' string.
     """
-    mock_result = Mock()  # Use a standard Mock
-
-    # Simulate that the item does NOT exist
-    mock_result.scalar_one_or_none.return_value = None
-    mock_db.execute.return_value = mock_result
-
     with pytest.raises(HTTPException) as exc_info:
         await create_favorite(
             user_id=1,
@@ -92,6 +105,7 @@ async def test_create_favorite_invalid_type(mock_db):
 
     assert exc_info.value.status_code == 400
     assert "Invalid favorite type" in exc_info.value.detail
+    mock_db.execute.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -124,18 +138,16 @@ async def test_erase_favorite_success(mock_db):
     Tests successfully erasing a favorite that exists.
     """
     mock_result = Mock()
-    mock_favorite = Mock()
-    mock_favorite.user_id = 1
-    mock_favorite.spotify_id = "abc123"
-    mock_favorite.type = "track"
-    mock_result.scalar_one_or_none.return_value = mock_favorite
+    # Simulate the DELETE ... RETURNING id of the removed row
+    mock_result.scalars.return_value.all.return_value = [7]
     mock_db.execute.return_value = mock_result
 
     result = await erase_favorite(1, "abc123", mock_db, "track")
 
     assert result is True
+    mock_db.execute.assert_called_once()
     mock_db.commit.assert_called_once()
-    mock_db.delete.assert_called_once_with(mock_favorite)
+    mock_db.delete.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -144,7 +156,7 @@ async def test_erase_favorite_not_found(mock_db):
     Tests attempting to erase a favorite that doesn't exist.
     """
     mock_result = Mock()
-    mock_result.scalar_one_or_none.return_value = None
+    mock_result.scalars.return_value.all.return_value = []
     mock_db.execute.return_value = mock_result
 
     result = await erase_favorite(1, "abc123", mock_db, "track")
@@ -159,14 +171,259 @@ async def test_erase_favorite_invalid_type(mock_db):
     """
     Tests attempting to erase a favorite with an invalid type.
     """
-    mock_result = Mock()
-    mock_result.scalar_one_or_none.return_value = None
-    mock_db.execute.return_value = mock_result
-
     with pytest.raises(HTTPException) as exc_info:
         await erase_favorite(1, "abc123", mock_db, "invalid_type")
 
     assert exc_info.value.status_code == 400
     assert "Invalid favorite type" in exc_info.value.detail
+    mock_db.execute.assert_not_called()
     mock_db.commit.assert_not_called()
-    mock_db.delete.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_fetch_spotify_data_in_batches_preserves_order():
+    """
+    Tests that ids are split into API-sized chunks and merged in input order.
+    """
+    ids = [f"id{i}" for i in range(45)]
+    fetch_func = AsyncMock(side_effect=lambda chunk: [{"id": i} for i in chunk])
+
+    result = await _fetch_spotify_data_in_batches(ids, fetch_func, 20)
+
+    assert [item["id"] for item in result] == ids
+    assert [len(call.args[0]) for call in fetch_func.call_args_list] == [20, 20, 5]
+
+
+@pytest.mark.asyncio
+async def test_fetch_spotify_data_in_batches_empty():
+    """
+    Tests that no request is made when there are no ids.
+    """
+    fetch_func = AsyncMock()
+
+    result = await _fetch_spotify_data_in_batches([], fetch_func, 50)
+
+    assert result == []
+    fetch_func.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_create_favorites_bulk_reports_per_item(mock_db):
+    """
+    Tests that one insert creates new items and reports existing and repeated ones.
+    """
+    items = [
+        FavoriteItem(spotify_id="t1", type="track"),
+        FavoriteItem(spotify_id="a1", type="album"),
+        FavoriteItem(spotify_id="t1", type="track"),
+    ]
+    # Only t1 was inserted, a1 already existed
+    mock_db.execute.return_value = [
+        SimpleNamespace(spotify_id="t1", type=FavoriteType.track)
+    ]
+
+    result = await create_favorites_bulk(1, items, mock_db)
+
+    assert result == [True, False, False]
+    mock_db.execute.assert_called_once()
+    mock_db.commit.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_erase_favorites_bulk_reports_per_item(mock_db):
+    """
+    Tests that one delete removes the found items and reports missing ones.
+    """
+    items = [
+        FavoriteItem(spotify_id="t1", type="track"),
+        FavoriteItem(spotify_id="missing", type="artist"),
+    ]
+    mock_db.execute.return_value = [
+        SimpleNamespace(spotify_id="t1", type=FavoriteType.track)
+    ]
+
+    result = await erase_favorites_bulk(1, items, mock_db)
+
+    assert result == [True, False]
+    mock_db.execute.assert_called_once()
+    mock_db.commit.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_get_favorite_returns_bool(mock_db):
+    """
+    Tests that the existence check answers with a plain boolean.
+    """
+    mock_result = Mock()
+    mock_result.scalar.return_value = True
+    mock_db.execute.return_value = mock_result
+
+    assert await get_favorite(1, "abc123", mock_db, "track") is True
+
+    mock_result.scalar.return_value = False
+    assert await get_favorite(1, "abc123", mock_db) is False
+
+
+@pytest.mark.asyncio
+async def test_get_favorited_ids_single_query(mock_db):
+    """
+    Tests that a page of ids is checked with one query.
+    """
+    mock_result = Mock()
+    mock_result.scalars.return_value.all.return_value = ["a", "c"]
+    mock_db.execute.return_value = mock_result
+
+    result = await get_favorited_ids(1, ["a", "b", "c"], mock_db)
+
+    assert result == {"a", "c"}
+    mock_db.execute.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_get_user_favorites_page_returns_next_cursor(mock_db):
+    """
+    Tests that an extra row signals another page and yields its cursor.
+    """
+    now = datetime.now(timezone.utc)
+    rows = [
+        SimpleNamespace(id=i, created_at=now - timedelta(minutes=i)) for i in range(3)
+    ]
+    mock_result = Mock()
+    mock_result.scalars.return_value.all.return_value = rows
+    mock_db.execute.return_value = mock_result
+
+    page, next_cursor = await get_user_favorites_page(1, mock_db, limit=2)
+    assert [row.id for row in page] == [0, 1]
+    assert next_cursor is not None
+
+    mock_result.scalars.return_value.all.return_value = rows[2:]
+    page, next_cursor = await get_user_favorites_page(
+        1, mock_db, limit=2, cursor=next_cursor, type="track"
+    )
+    assert [row.id for row in page] == [2]
+    assert next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_count_user_favorites_cached_until_write(mock_db):
+    """
+    Tests that the count query runs once and again only after a write.
+    """
+    favorite_counts.clear()
+    count_result = Mock()
+    count_result.scalar_one.return_value = 12
+    mock_db.execute.return_value = count_result
+
+    assert await count_user_favorites(1, mock_db) == 12
+    assert await count_user_favorites(1, mock_db) == 12
+    assert mock_db.execute.call_count == 1
+
+    insert_result = Mock()
+    insert_result.scalar_one_or_none.return_value = 99
+    mock_db.execute.return_value = insert_result
+    await create_favorite(user_id=1, spotify_id="new", db=mock_db, type="track")
+
+    count_result.scalar_one.return_value = 13
+    mock_db.execute.return_value = count_result
+    assert await count_user_favorites(1, mock_db) == 13
+    favorite_counts.clear()
+
+
+@pytest.mark.asyncio
+async def test_spotify_metadata_page_summary(mock_db, monkeypatch):
+    """
+    Tests that a metadata page only enriches that page and can be summarized.
+    """
+    now = datetime.now(timezone.utc)
+    rows = [
+        SimpleNamespace(
+            id=i,
+            spotify_id=f"t{i}",
+            type=FavoriteType.track,
+            created_at=now - timedelta(minutes=i),
+        )
+        for i in range(3)
+    ]
+    mock_result = Mock()
+    mock_result.scalars.return_value.all.return_value = rows
+    mock_db.execute.return_value = mock_result
+
+    fetched = []
+
+    async def fake_tracks(ids):
+        fetched.extend(ids)
+        return [
+            {
+                "id": id,
+                "name": f"Track {id}",
+                "album": {"images": [{"url": f"https://img/{id}"}]},
+                "external_urls": {"spotify": f"https://open/{id}"},
+            }
+            for id in ids
+        ]
+
+    monkeypatch.setattr(favorite_crud, "get_tracks_by_ids", fake_tracks)
+
+    metadata, next_cursor = await get_spotify_metadata_for_user_favorites(
+        1, mock_db, limit=2, summary=True
+    )
+    assert fetched == ["t0", "t1"]
+    assert next_cursor is not None
+    assert metadata["tracks"][0] == {
+        "name": "Track t0",
+        "id": "t0",
+        "type": "track",
+        "image": "https://img/t0",
+        "url": "https://open/t0",
+    }
+    assert metadata["artists"] == [] and metadata["albums"] == []
+
+
+@pytest.mark.asyncio
+async def test_add_favorite_endpoint_reports_duplicate(mock_db):
+    """
+    Tests that POST /favorites/ reports False when the favorite already exists.
+    """
+    mock_result = Mock()
+    mock_result.scalar_one_or_none.side_effect = [7, None]
+    mock_db.execute.return_value = mock_result
+    app.dependency_overrides[get_db] = lambda: mock_db
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1)
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://testserver"
+        ) as client:
+            params = {"spotify_id": "abc123", "type": "track"}
+            first = await client.post("/favorites/", params=params)
+            second = await client.post("/favorites/", params=params)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first.json() == {"result": True}
+    assert second.json() == {"result": False}
+
+
+@pytest.mark.asyncio
+async def test_spotify_metadata_without_limit_filters_type(mock_db, monkeypatch):
+    """
+    Tests that the unpaged metadata query still filters by type and is ordered.
+    """
+    mock_result = Mock()
+    mock_result.scalars.return_value.all.return_value = [
+        SimpleNamespace(spotify_id="a1", type=FavoriteType.album)
+    ]
+    mock_db.execute.return_value = mock_result
+    monkeypatch.setattr(
+        favorite_crud, "get_albums_by_ids", AsyncMock(return_value=[{"id": "a1"}])
+    )
+
+    metadata, next_cursor = await get_spotify_metadata_for_user_favorites(
+        1, mock_db, type="album"
+    )
+
+    sql = str(mock_db.execute.call_args.args[0])
+    assert "favorites.type = " in sql
+    assert "ORDER BY favorites.created_at DESC, favorites.id DESC" in sql
+    assert "LIMIT" not in sql
+    assert metadata == {"tracks": [], "artists": [], "albums": [{"id": "a1"}]}
+    assert next_cursor is None
@@ -0,0 +1,34 @@
+import pytest
+from unittest.mock import patch
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.models.base import Base
+from app.models.spotify_metadata import SpotifyMetadata
+from app.services.metadata_cache import PostgresMetadataBackend
+
+
+@pytest.mark.asyncio
+async def test_postgres_backend_round_trip(db_session: AsyncSession):
+    """Test the shared metadata tier against a schema built by create_all."""
+    engine = db_session.bind
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(
+        bind=engine, class_=AsyncSession, expire_on_commit=False
+    )
+    backend = PostgresMetadataBackend()
+
+    try:
+        with patch("app.services.metadata_cache.AsyncSessionLocal", sessions):
+            await backend.set_many("track", {"t1": {"id": "t1", "name": "Old"}})
+            await backend.set_many("track", {"t1": {"id": "t1", "name": "Song"}})
+            found = await backend.get_many("track", ["t1", "t2"])
+            other_type = await backend.get_many("album", ["t1"])
+    finally:
+        async with sessions() as session:
+            await session.execute(delete(SpotifyMetadata))
+            await session.commit()
+
+    assert found == {"t1": {"id": "t1", "name": "Song"}}
+    assert other_type == {}
+    assert backend.stats() == {"hits": 1, "misses": 2, "errors": 0}
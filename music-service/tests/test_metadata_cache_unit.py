@@ -0,0 +1,60 @@
+import pytest
+from unittest.mock import AsyncMock
+from app.core.cache import TTLCache
+from app.services.metadata_cache import MemoryMetadataBackend, MetadataCache
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """
+    Tests that the oldest unused entry is evicted once the cache is full.
+    """
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_ttl_cache_expires_entries():
+    """
+    Tests that entries are not returned after their TTL.
+    """
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1, ttl=0)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_metadata_cache_fetches_only_misses():
+    """
+    Tests that a batch lookup only goes upstream for uncached ids.
+    """
+    cache = MetadataCache([MemoryMetadataBackend()])
+    fetch = AsyncMock(side_effect=lambda ids: [{"id": i} for i in ids])
+
+    first = await cache.get_many("track", ["a", "b"], fetch)
+    second = await cache.get_many("track", ["b", "c", "a"], fetch)
+
+    assert [item["id"] for item in first] == ["a", "b"]
+    assert [item["id"] for item in second] == ["b", "c", "a"]
+    assert [call.args[0] for call in fetch.call_args_list] == [["a", "b"], ["c"]]
+
+
+@pytest.mark.asyncio
+async def test_metadata_cache_does_not_cache_unknown_ids():
+    """
+    Tests that null results from Spotify are returned but not cached.
+    """
+    cache = MetadataCache([MemoryMetadataBackend()])
+    fetch = AsyncMock(return_value=[None])
+
+    assert await cache.get_many("album", ["missing"], fetch) == [None]
+    assert await cache.get_many("album", ["missing"], fetch) == [None]
+    assert fetch.call_count == 2
@@ -0,0 +1,102 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from app.services import spotify_search
+from app.services.spotify_search import search_spotify_entities
+
+
+@pytest.fixture(autouse=True)
+def clear_search_cache():
+    spotify_search.search_cache.clear()
+    yield
+    spotify_search.search_cache.clear()
+
+
+def _artist(name):
+    return {
+        "name": name,
+        "id": f"id-{name}",
+        "images": [{"url": f"img-{name}"}],
+        "external_urls": {"spotify": f"url-{name}"},
+    }
+
+
+@pytest.mark.asyncio
+async def test_search_spotify_entities_keeps_input_order():
+    """
+    Tests that results come back in input order even if searches finish out of order.
+    """
+
+    async def search_one(name, type_):
+        await asyncio.sleep(0.03 if name == "A" else 0)
+        return spotify_search.summarize_entity(_artist(name), type_)
+
+    with patch.object(spotify_search, "_search_one", side_effect=search_one):
+        results = await search_spotify_entities(["A", "B", "C"], "artist")
+
+    assert [r["name"] for r in results] == ["A", "B", "C"]
+    assert results[0]["image"] == "img-A"
+    assert results[0]["url"] == "url-A"
+
+
+@pytest.mark.asyncio
+async def test_search_spotify_entities_memoizes_names():
+    """
+    Tests that repeated names are served from the cache.
+    """
+
+    async def search_one(name, type_):
+        return spotify_search.summarize_entity(_artist(name), type_)
+
+    with patch.object(
+        spotify_search, "_search_one", side_effect=search_one
+    ) as mock_search:
+        await search_spotify_entities(["Daft Punk"], "artist")
+        results = await search_spotify_entities(["  daft   punk "], "artist")
+
+    assert [r["name"] for r in results] == ["Daft Punk"]
+    assert mock_search.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_search_spotify_entities_skips_failures_and_timeouts():
+    """
+    Tests that a failing or slow name is dropped without failing the batch.
+    """
+
+    async def search_one(name, type_):
+        if name == "boom":
+            raise RuntimeError("upstream error")
+        if name == "slow":
+            await asyncio.sleep(1)
+        return spotify_search.summarize_entity(_artist(name), type_)
+
+    with patch.object(
+        spotify_search, "_search_one", side_effect=search_one
+    ), patch.object(spotify_search, "SEARCH_TIMEOUT", 0.05):
+        results = await search_spotify_entities(["ok", "boom", "slow"], "artist")
+
+    assert [r["name"] for r in results] == ["ok"]
+
+
+@pytest.mark.asyncio
+async def test_summarize_entities_by_ids_chunks_and_skips_unknown():
+    """
+    Tests that ids are fetched in per-type chunks and unknown ids are dropped.
+    """
+    calls = []
+
+    async def get_artists(ids):
+        calls.append(ids)
+        return [None if i == "missing" else _artist(i) for i in ids]
+
+    with patch.dict(spotify_search.BY_IDS, {"artist": (get_artists, 2)}):
+        results = await spotify_search.summarize_entities_by_ids(
+            ["A", "missing", "C"], "artist"
+        )
+
+    assert calls == [["A", "missing"], ["C"]]
+    assert [r["name"] for r in results] == ["A", "C"]
+
+    with pytest.raises(ValueError):
+        await spotify_search.summarize_entities_by_ids(["A"], "playlist")
@@ -0,0 +1,114 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from fastapi import HTTPException
+from app.services.spotify_token import SpotifyTokenManager
+
+
+def _token_response(token="token-1", expires_in=3600, status_code=200):
+    response = Mock()
+    response.status_code = status_code
+    response.json.return_value = {"access_token": token, "expires_in": expires_in}
+    return response
+
+
+@pytest.fixture
+def spotify_credentials(monkeypatch):
+    monkeypatch.setenv("SPOTIFY_CLIENT_ID", "client-id")
+    monkeypatch.setenv("SPOTIFY_CLIENT_SECRET", "client-secret")
+
+
+@pytest.fixture
+def mock_accounts_client():
+    client = Mock()
+    client.post = AsyncMock()
+    with patch("app.services.spotify_token.get_http_client", return_value=client):
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_token_is_cached_until_expiry(spotify_credentials, mock_accounts_client):
+    """
+    Tests that repeated calls reuse the cached token.
+    """
+    mock_accounts_client.post.return_value = _token_response()
+    manager = SpotifyTokenManager(refresh_margin=60)
+
+    assert await manager.get_token() == "token-1"
+    assert await manager.get_token() == "token-1"
+    assert await manager.get_token() == "token-1"
+
+    mock_accounts_client.post.assert_called_once()
+    assert manager.refreshes == 1
+    assert manager.hits == 2
+
+
+@pytest.mark.asyncio
+async def test_expired_token_is_refreshed(spotify_credentials, mock_accounts_client):
+    """
+    Tests that an expired token triggers exactly one new token request.
+    """
+    mock_accounts_client.post.side_effect = [
+        _token_response("token-1", 0),
+        _token_response("token-2"),
+    ]
+    manager = SpotifyTokenManager(refresh_margin=0)
+
+    assert await manager.get_token() == "token-1"
+    assert await manager.get_token() == "token-2"
+    assert await manager.get_token() == "token-2"
+    assert manager.refreshes == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_refresh(
+    spotify_credentials, mock_accounts_client
+):
+    """
+    Tests that a burst of callers triggers a single token request.
+    """
+    mock_accounts_client.post.return_value = _token_response()
+    manager = SpotifyTokenManager()
+
+    tokens = await asyncio.gather(*(manager.get_token() for _ in range(10)))
+
+    assert set(tokens) == {"token-1"}
+    mock_accounts_client.post.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_token_refresh_failure(spotify_credentials, mock_accounts_client):
+    """
+    Tests that a failed token request raises and is counted.
+    """
+    mock_accounts_client.post.return_value = _token_response(status_code=401)
+    manager = SpotifyTokenManager()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await manager.get_token()
+
+    assert exc_info.value.status_code == 500
+    assert manager.failures == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("payload", [{"token_type": "Bearer"}, ValueError("not json")])
+async def test_malformed_token_response(
+    spotify_credentials, mock_accounts_client, payload
+):
+    """
+    Tests that a 200 response without a usable token raises and is counted.
+    """
+    response = _token_response()
+    if isinstance(payload, Exception):
+        response.json.side_effect = payload
+    else:
+        response.json.return_value = payload
+    mock_accounts_client.post.return_value = response
+    manager = SpotifyTokenManager()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await manager.get_token()
+
+    assert exc_info.value.status_code == 500
+    assert manager.failures == 1